@@ -1,22 +1,63 @@
 import duckdb
 
-def safe_numeric_expr(column_name: str) -> str:
+from core.partitions import parse_time_value
+from core.query_cache import get_result_cache
+from db.duckdb_conn import quote_identifier, quote_literal, record_query_memory, thread_cursor
+
+ORDER_DIRECTIONS = ["ASC", "DESC"]
+GROWTH_COMPARISONS = ["yoy", "qoq"]
+FETCH_KINDS = ["df", "numpy", "arrow"]
+
+
+def safe_numeric_expr(column_name: str, clean: bool = False) -> str:
     """
-    Always cast metric to DOUBLE to avoid SUM(VARCHAR) errors.
+    Cast metric to DOUBLE to avoid SUM(VARCHAR) errors. Clean metrics
+    (already numeric in the typed table) are aggregated as they are.
     """
+    if clean:
+        return column_name
     return f'TRY_CAST({column_name} AS DOUBLE)'
 
+def inline_literal(value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return quote_literal(value)
+
+
+def build_query(intent: dict, table_name: str = "sales"):
+    """
+    Parameterized query for an intent: (sql, params). Values are bound,
+    so every question of the same shape produces the same SQL text.
+    """
+    params = []
 
+    def bind(value):
+        params.append(value)
+        return "?"
 
-def quote_identifier(identifier: str) -> str:
-    return f'"{identifier}"'
+    return compose_query(intent, table_name, bind), params
 
 
 def build_sql_query(intent: dict, table_name: str = "sales") -> str:
+    """
+    Same query with values inlined as escaped literals (for display and
+    callers that need a single SQL string).
+    """
+    return compose_query(intent, table_name, inline_literal)
+
+
+def compose_query(intent: dict, table_name: str, bind) -> str:
+    """
+    `bind(value)` returns the SQL that stands for a value: a "?"
+    placeholder or an inline literal.
+    """
     # ---------- Guard ----------
     if intent.get("metric") is None:
         raise ValueError("No numeric metric available for aggregation.")
 
+    if growth_comparison(intent):
+        return compose_growth_query(intent, table_name, bind)
+
     aggregation = intent["aggregation"]
     group_by = intent.get("group_by", [])
     filters = intent.get("filters", {})
@@ -24,25 +65,19 @@ def build_sql_query(intent: dict, table_name: str = "sales") -> str:
     # DEFENSIVE GUARD: remove logical time filters
     # --------------------------------------------------
     date_fields = intent.get("time_fields", [])
+    time_columns = intent.get("time_columns") or {}
 
-    if not date_fields:
+    if not date_fields and not time_columns:
         filters = {
             k: v for k, v in filters.items()
             if k not in ["year", "quarter", "month"]
         }
     # ---------- Metric ----------
     raw_metric = quote_identifier(intent["metric"])
-    metric_expr = safe_numeric_expr(raw_metric)
+    metric_expr = safe_numeric_expr(raw_metric, intent["metric"] in (intent.get("clean_metrics") or []))
 
     # ---------- SELECT ----------
-    if aggregation == "sum":
-        select_expr = f"SUM({metric_expr}) AS value"
-    elif aggregation == "avg":
-        select_expr = f"AVG({metric_expr}) AS value"
-    elif aggregation == "count":
-        select_expr = f"COUNT({raw_metric}) AS value"
-    else:
-        raise ValueError(f"Unsupported aggregation: {aggregation}")
+    select_expr = f"{aggregate_sql(aggregation, raw_metric, metric_expr)} AS value"
 
     quoted_group_by = [quote_identifier(col) for col in group_by]
 
@@ -61,12 +96,12 @@ def build_sql_query(intent: dict, table_name: str = "sales") -> str:
     )
 
     for col, val in filters.items():
-        if col in ["year", "quarter", "month"] and date_column:
-            time_sql = resolve_time_filter(col, val, date_column)
+        if col in ["year", "quarter", "month"] and (date_column or time_columns):
+            time_sql = resolve_time_filter(col, val, date_column, time_columns, bind)
             if time_sql:
                 where_clauses.append(time_sql)
         else:
-            where_clauses.append(f"{quote_identifier(col)} = '{val}'")
+            where_clauses.append(f"{quote_identifier(col)} = {bind(str(val))}")
 
     for col in group_by:
         where_clauses.append(f"{quote_identifier(col)} IS NOT NULL")
@@ -89,14 +124,17 @@ def build_sql_query(intent: dict, table_name: str = "sales") -> str:
     limit_sql = ""
 
     if intent.get("order_by") == "value":
-        order_sql = f"ORDER BY value {intent.get('order_direction', 'ASC')}"
+        direction = str(intent.get("order_direction") or "ASC").upper()
+        if direction not in ORDER_DIRECTIONS:
+            direction = "ASC"
+        order_sql = f"ORDER BY value {direction}"
 
     if intent.get("limit"):
-        limit_sql = f"LIMIT {intent['limit']}"
+        limit_sql = f"LIMIT {bind(int(intent['limit']))}"
 
     sql = f"""
     SELECT {select_clause}
-    FROM {table_name}
+    FROM {quote_identifier(table_name)}
     {where_sql}
     {group_by_sql}
     {having_sql}
@@ -107,22 +145,213 @@ def build_sql_query(intent: dict, table_name: str = "sales") -> str:
     return sql.strip()
 
 
-def execute_query(con: duckdb.DuckDBPyConnection, sql: str):
-    return con.execute(sql).fetchdf()
+def aggregate_sql(aggregation: str, raw_metric: str, metric_expr: str) -> str:
+    if aggregation == "sum":
+        return f"SUM({metric_expr})"
+    if aggregation == "avg":
+        return f"AVG({metric_expr})"
+    if aggregation == "count":
+        return f"COUNT({raw_metric})"
+    raise ValueError(f"Unsupported aggregation: {aggregation}")
+
+
+def growth_comparison(intent: dict):
+    """
+    "yoy" / "qoq" for period-over-period growth intents, else None.
+    aggregation="yoy_growth" is year-over-year growth of the sum.
+    """
+    if intent.get("comparison") in GROWTH_COMPARISONS:
+        return intent["comparison"]
+    if intent.get("aggregation") == "yoy_growth":
+        return "yoy"
+    return None
+
+
+def compose_growth_query(intent: dict, table_name: str, bind) -> str:
+    """
+    Period-over-period growth in one scan: aggregate per period (and
+    group), then LAG over each group's periods. `value` is the growth in
+    percent; a previous period that is missing from the data gives no row.
+    Year / quarter filters pick the reported periods after the window, so
+    the previous period is still read; finer time filters (e.g. Q4 for a
+    year-over-year comparison) restrict every period alike.
+    """
+    comparison = growth_comparison(intent)
+    aggregation = intent["aggregation"] if intent["aggregation"] in ["sum", "avg", "count"] else "sum"
+    group_by = intent.get("group_by") or []
+    filters = intent.get("filters") or {}
+    time_columns = intent.get("time_columns") or {}
+    date_fields = intent.get("time_fields") or []
+    date_column = quote_identifier(date_fields[0]) if date_fields else None
+
+    levels = ["year"] if comparison == "yoy" else ["year", "quarter"]
+    period_sql = {level: time_part_sql(level, date_column, time_columns) for level in levels}
+    if not all(period_sql.values()):
+        raise ValueError("Growth comparisons need a date column or year / quarter columns.")
+
+    raw_metric = quote_identifier(intent["metric"])
+    metric_expr = safe_numeric_expr(raw_metric, intent["metric"] in (intent.get("clean_metrics") or []))
+    quoted_group_by = [quote_identifier(col) for col in group_by]
+    period_columns = [f"period_{level}" for level in levels]
+    key_sql = "".join(f"{col}, " for col in quoted_group_by)
+
+    # ---------- Per-period aggregate ----------
+    where_clauses = [f"{expr} IS NOT NULL" for expr in period_sql.values()]
+    reported = {}
+
+    for col, val in filters.items():
+        if col in levels:
+            reported[col] = val
+        elif col in ["year", "quarter", "month"]:
+            time_sql = resolve_time_filter(col, val, date_column, time_columns, bind)
+            if time_sql:
+                where_clauses.append(time_sql)
+        else:
+            where_clauses.append(f"{quote_identifier(col)} = {bind(str(val))}")
+
+    for col in quoted_group_by:
+        where_clauses.append(f"{col} IS NOT NULL")
+
+    period_select = ", ".join(f"{period_sql[level]} AS period_{level}" for level in levels)
+
+    # ---------- Growth vs. the directly preceding period ----------
+    index_sql = "period_year" if comparison == "yoy" else "period_year * 4 + period_quarter"
+    partition_sql = f"PARTITION BY {', '.join(quoted_group_by)} " if quoted_group_by else ""
+
+    outer_clauses = ["previous_value IS NOT NULL"]
+    for col, val in reported.items():
+        value = parse_time_value(col, val)
+        if value is not None:
+            outer_clauses.append(f"period_{col} = {bind(value)}")
+
+    # ---------- ORDER / LIMIT ----------
+    if intent.get("order_by") == "value":
+        direction = str(intent.get("order_direction") or "ASC").upper()
+        if direction not in ORDER_DIRECTIONS:
+            direction = "ASC"
+        order_sql = f"ORDER BY value {direction} NULLS LAST"
+    else:
+        order_sql = f"ORDER BY {key_sql}{', '.join(period_columns)}"
+
+    limit_sql = f"LIMIT {bind(int(intent['limit']))}" if intent.get("limit") else ""
+
+    sql = f"""
+    WITH periods AS (
+        SELECT {key_sql}{period_select},
+               {aggregate_sql(aggregation, raw_metric, metric_expr)} AS current_value
+        FROM {quote_identifier(table_name)}
+        WHERE {' AND '.join(where_clauses)}
+        GROUP BY {key_sql}{', '.join(period_columns)}
+    ),
+    growth AS (
+        SELECT *,
+               CASE WHEN LAG({index_sql}) OVER w = {index_sql} - 1
+                    THEN LAG(current_value) OVER w END AS previous_value
+        FROM periods
+        WINDOW w AS ({partition_sql}ORDER BY {', '.join(period_columns)})
+    )
+    SELECT {key_sql}{', '.join(period_columns)}, current_value, previous_value,
+           ROUND((current_value - previous_value) * 100.0 / NULLIF(ABS(previous_value), 0), 2) AS value
+    FROM growth
+    WHERE {' AND '.join(outer_clauses)}
+    {order_sql}
+    {limit_sql}
+    """
+
+    return sql.strip()
+
+
+def time_part_sql(level: str, date_column, time_columns: dict):
+    """
+    SQL for a year / quarter / month value: a partition or derived column
+    when there is one, else extracted from the date column.
+    """
+    if level in time_columns:
+        return quote_identifier(time_columns[level])
+    if level == "quarter" and "month" in time_columns:
+        return f"(({quote_identifier(time_columns['month'])} - 1) // 3 + 1)"
+    if date_column:
+        return f"EXTRACT({level.upper()} FROM {date_column})"
+    return None
+
+
+def execute_query(con: duckdb.DuckDBPyConnection, sql: str, params: list = None, fetch: str = "df"):
+    """
+    Run on the calling thread's cursor; identical SQL and parameters are
+    answered from the connection's result cache without scanning the table.
+
+    fetch: "df" (pandas DataFrame), "numpy" (column name -> NumPy array,
+    masked where NULL) or "arrow" (pyarrow Table). The last two skip
+    building a DataFrame; NumPy results are shared with the cache and
+    read-only.
+    """
+    if fetch not in FETCH_KINDS:
+        raise ValueError(f"Unsupported fetch kind: {fetch}")
+
+    cache = get_result_cache(con)
+    if cache is not None:
+        cached = cache.get(sql, params, fetch)
+        if cached is not None:
+            return cached
+
+    cursor = thread_cursor(con)
+    relation = cursor.execute(sql, params)
+    if fetch == "numpy":
+        result = relation.fetchnumpy()
+    elif fetch == "arrow":
+        result = relation.fetch_arrow_table()
+    else:
+        result = relation.fetchdf()
+    record_query_memory(con, cursor)
+
+    if cache is not None:
+        cache.put(sql, result, params, fetch)
+    return result
+
 
-def resolve_time_filter(col, val, date_column):
+def resolve_time_filter(col, val, date_column, time_columns=None, bind=inline_literal):
     """
     Convert logical time filters (year, quarter, month)
     into SQL expressions using a real date column.
+    Partition columns are preferred so whole files can be pruned
+    (DuckDB prunes on bound parameters as well as on literals).
     """
+    partition_sql = resolve_partition_filter(col, val, time_columns or {}, bind)
+    if partition_sql:
+        return partition_sql
+
+    value = parse_time_value(col, val)
+    if not date_column or value is None:
+        return None
+
     if col == "year":
-        return f"EXTRACT(YEAR FROM {date_column}) = {val}"
+        return f"EXTRACT(YEAR FROM {date_column}) = {bind(value)}"
 
     if col == "quarter":
-        q = val.upper().replace("Q", "")
-        return f"EXTRACT(QUARTER FROM {date_column}) = {q}"
+        return f"EXTRACT(QUARTER FROM {date_column}) = {bind(value)}"
 
     if col == "month":
-        return f"EXTRACT(MONTH FROM {date_column}) = {val}"
+        return f"EXTRACT(MONTH FROM {date_column}) = {bind(value)}"
+
+    return None
+
+
+def resolve_partition_filter(col, val, time_columns: dict, bind=inline_literal):
+    """
+    Filter on year / quarter / month partition columns instead of the date.
+    """
+    value = parse_time_value(col, val)
+    if value is None:
+        return None
+
+    if col in time_columns:
+        return f"{quote_identifier(time_columns[col])} = {bind(value)}"
+
+    if col == "quarter" and "month" in time_columns:
+        first_month = (value - 1) * 3 + 1
+        return (
+            f"{quote_identifier(time_columns['month'])} "
+            f"BETWEEN {bind(first_month)} AND {bind(first_month + 2)}"
+        )
 
-    return None
\ No newline at end of file
+    return None
@@ -1,31 +1,61 @@
-import json
-from pathlib import Path
-from config.llm_config import get_openai_client
+from core.llm_gateway import achat_completion, chat_completion
+from core.prompts import build_messages, compact_json
 
-client = get_openai_client()
-PROMPT_PATH = Path("prompts/explanation_prompt.txt")
+PROMPT_NAME = "explanation_prompt"
 
-def generate_explanation(original_question: str, reasoning_output: dict) -> str:
-    system_prompt = PROMPT_PATH.read_text()
+def build_explanation_messages(original_question: str, reasoning_output: dict) -> list:
     safe_facts = compress_facts_for_llm(reasoning_output)
-    user_input = f"""
-    User question:
-    {original_question}
+    user_input = (
+        f"User question:\n{original_question}\n\n"
+        f"Analysis result:\n{compact_json(safe_facts)}"
+    )
+
+    return build_messages(PROMPT_NAME, user_input)
+
+
+def generate_explanation(original_question: str, reasoning_output: dict) -> str:
+    response = chat_completion(
+        model="gpt-4.1-mini",
+        messages=build_explanation_messages(original_question, reasoning_output),
+        temperature=0.2,
+        agent="explanation"
+    )
+
+    return response.choices[0].message.content.strip()
+
 
-    Analysis result:
-    {json.dumps(safe_facts, indent=2)}
+def stream_explanation(original_question: str, reasoning_output: dict):
+    """
+    Yield the explanation as it is generated. The concatenated (stripped)
+    chunks equal what generate_explanation returns.
     """
+    stream = chat_completion(
+        model="gpt-4.1-mini",
+        messages=build_explanation_messages(original_question, reasoning_output),
+        temperature=0.2,
+        stream=True,
+        agent="explanation"
+    )
 
-    response = client.chat.completions.create(
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content
+        if text:
+            yield text
+
+
+async def generate_explanation_async(original_question: str, reasoning_output: dict) -> str:
+    response = await achat_completion(
         model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_input}
-        ],
-        temperature=0.2
+        messages=build_explanation_messages(original_question, reasoning_output),
+        temperature=0.2,
+        agent="explanation"
     )
 
     return response.choices[0].message.content.strip()
+
+
 def compress_facts_for_llm(facts: dict, max_items: int = 3) -> dict:
     """
     Reduce summary facts to a small, LLM-safe structure.
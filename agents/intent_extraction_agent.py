@@ -1,31 +1,21 @@
 import json
-from pathlib import Path
-from config.llm_config import get_openai_client
+from core.llm_gateway import achat_completion, chat_completion
+from core.prompts import build_messages, compact_schema
+from agents.intent_rule_parser import parse_intent_rules
 
-client = get_openai_client()
-PROMPT_PATH = Path("prompts/intent_extraction_prompt.txt")
+PROMPT_NAME = "intent_extraction_prompt"
 
 
-def extract_query_intent(user_input: str, semantic_schema: dict) -> dict:
-    system_prompt = PROMPT_PATH.read_text()
-
-    user_message = f"""
-    Semantic schema:
-    {json.dumps(semantic_schema, indent=2)}
-
-    User question:
-    {user_input}
-    """
-
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ],
-        temperature=0
+def build_intent_messages(user_input: str, semantic_schema: dict) -> list:
+    # Schema goes in the system message: a stable prefix per dataset
+    return build_messages(
+        PROMPT_NAME,
+        f"User question:\n{user_input}",
+        context=f"Semantic schema:\n{compact_schema(semantic_schema)}"
     )
 
+
+def parse_intent_response(response, user_input: str, semantic_schema: dict) -> dict:
     raw_output = response.choices[0].message.content.strip()
 
     if not raw_output.startswith("{"):
@@ -36,6 +26,10 @@ def extract_query_intent(user_input: str, semantic_schema: dict) -> dict:
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON from intent agent:\n{raw_output}") from e
 
+    return finalize_intent(intent, user_input, semantic_schema)
+
+
+def finalize_intent(intent: dict, user_input: str, semantic_schema: dict) -> dict:
     # ✅ Normalize & validate
     intent = validate_and_normalize_intent(intent, semantic_schema)
 
@@ -46,6 +40,37 @@ def extract_query_intent(user_input: str, semantic_schema: dict) -> dict:
     return check_intent_feasibility(intent, semantic_schema)
 
 
+def extract_query_intent(user_input: str, semantic_schema: dict) -> dict:
+    # ✅ Deterministic fast path (no LLM call)
+    rule_intent = parse_intent_rules(user_input, semantic_schema)
+    if rule_intent is not None:
+        return finalize_intent(rule_intent, user_input, semantic_schema)
+
+    response = chat_completion(
+        model="gpt-4.1-mini",
+        messages=build_intent_messages(user_input, semantic_schema),
+        temperature=0,
+        agent="intent_extraction"
+    )
+
+    return parse_intent_response(response, user_input, semantic_schema)
+
+
+async def extract_query_intent_async(user_input: str, semantic_schema: dict) -> dict:
+    rule_intent = parse_intent_rules(user_input, semantic_schema)
+    if rule_intent is not None:
+        return finalize_intent(rule_intent, user_input, semantic_schema)
+
+    response = await achat_completion(
+        model="gpt-4.1-mini",
+        messages=build_intent_messages(user_input, semantic_schema),
+        temperature=0,
+        agent="intent_extraction"
+    )
+
+    return parse_intent_response(response, user_input, semantic_schema)
+
+
 def validate_and_normalize_intent(intent: dict, semantic_schema: dict) -> dict:
     allowed_metrics = semantic_schema.get("metrics", [])
     allowed_dimensions = semantic_schema.get("dimensions", [])
@@ -74,9 +99,16 @@ def validate_and_normalize_intent(intent: dict, semantic_schema: dict) -> dict:
     if not isinstance(raw_filters, dict):
         raw_filters = {}
 
+    # Logical time filters are valid when a date or partition column exists
+    time_keys = (
+        ["year", "quarter", "month"]
+        if allowed_time_fields or semantic_schema.get("time_columns")
+        else []
+    )
+
     intent["filters"] = {
         k: v for k, v in raw_filters.items()
-        if k in allowed_dimensions or k in allowed_time_fields
+        if k in allowed_dimensions or k in allowed_time_fields or k in time_keys
     }
 
     # time_granularity
@@ -85,7 +117,7 @@ def validate_and_normalize_intent(intent: dict, semantic_schema: dict) -> dict:
         intent["time_granularity"] = None
 
     # comparison
-    if intent.get("comparison") not in ["yoy", None]:
+    if intent.get("comparison") not in ["yoy", "qoq", None]:
         intent["comparison"] = None
 
     return intent
@@ -97,7 +129,7 @@ def check_intent_feasibility(intent: dict, semantic_schema: dict) -> dict:
         or intent.get("comparison") is not None
     )
 
-    if time_required and not semantic_schema.get("time_fields"):
+    if time_required and not (semantic_schema.get("time_fields") or semantic_schema.get("time_columns")):
         return {
             "status": "invalid",
             "reason": "The dataset does not contain time-based fields required for this analysis.",
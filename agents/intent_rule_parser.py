@@ -0,0 +1,200 @@
+import re
+import threading
+
+AGGREGATION_PATTERNS = [
+    ("avg", r"\b(average|avg|mean)\b"),
+    ("count", r"\b(count|how many|number of)\b"),
+    ("sum", r"\b(total|sum|overall)\b"),
+]
+
+DESCENDING_WORDS = r"\b(top|highest|best|most|largest|biggest|max|maximum)\b"
+ASCENDING_WORDS = r"\b(bottom|lowest|worst|least|smallest|min|minimum|underperform\w*)\b"
+TOP_N_PATTERN = r"\b(?:top|bottom)\s+(\d{1,4})\b"
+QUARTER_PATTERN = r"\bq([1-4])\b"
+YEAR_PATTERN = r"\b((?:19|20)\d{2})\b"
+
+# Anything the fast path cannot express goes to the LLM
+UNSUPPORTED_PATTERN = (
+    r"\b(yoy|qoq|growth|compare|compared|comparison|vs|versus|change|trend|why|"
+    r"ratio|percent|percentage|share|between|except|excluding|without|not)\b"
+)
+
+# Words that carry no meaning for the intent
+FILLER_WORDS = {
+    "a", "all", "an", "and", "are", "across", "by", "can", "did", "do", "does",
+    "each", "every", "for", "from", "give", "has", "have", "how", "i", "in",
+    "is", "it", "list", "me", "much", "of", "on", "per", "please", "show",
+    "tell", "the", "there", "to", "value", "values", "was", "we", "were",
+    "what", "whats", "which", "who", "with", "distribution", "breakdown",
+    "wise", "level", "data", "our", "performing", "performer", "performers",
+    "sold", "selling", "sells", "had",
+}
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    text = text.lower().replace("_", " ")
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def field_pattern(field: str) -> str:
+    """
+    Regex for a schema field name, allowing a plural last word
+    ("category" -> "categories", "sku" -> "skus").
+    """
+    words = normalize_text(field).split()
+    if not words:
+        return None
+
+    last = re.escape(words[-1])
+    if words[-1].endswith("y"):
+        last = f"(?:{last}|{re.escape(words[-1][:-1])}ies)"
+    else:
+        last = f"{last}(?:s|es)?"
+
+    return r"\b" + r"\s+".join([re.escape(w) for w in words[:-1]] + [last]) + r"\b"
+
+
+def match_fields(text: str, fields: list):
+    """
+    Fields mentioned in `text`, longest names first so "Final MRP Old"
+    wins over "MRP Old". Returns (matches, text with matches removed).
+    """
+    matches = []
+
+    for field in sorted(fields, key=lambda f: len(normalize_text(f)), reverse=True):
+        pattern = field_pattern(field)
+        if pattern and re.search(pattern, text):
+            matches.append(field)
+            text = re.sub(pattern, " ", text)
+
+    return matches, text
+
+
+def _parse(user_input: str, semantic_schema: dict):
+    text = normalize_text(user_input)
+    metrics = semantic_schema.get("metrics", [])
+    dimensions = semantic_schema.get("dimensions", [])
+
+    if not metrics or re.search(UNSUPPORTED_PATTERN, text):
+        return None
+
+    # ---------- Fields ----------
+    metric_matches, rest = match_fields(text, metrics)
+    dimension_matches, rest = match_fields(rest, dimensions)
+
+    if len(metric_matches) > 1:
+        return None
+
+    # ---------- Aggregation ----------
+    aggregation = None
+    for name, pattern in AGGREGATION_PATTERNS:
+        if re.search(pattern, rest):
+            aggregation = name
+            rest = re.sub(pattern, " ", rest)
+            break
+
+    # ---------- Ranking / top N ----------
+    intent_order = {}
+    top_n = re.search(TOP_N_PATTERN, rest)
+    if top_n:
+        intent_order["limit"] = int(top_n.group(1))
+        rest = rest.replace(top_n.group(1), " ", 1)
+
+    if re.search(ASCENDING_WORDS, rest):
+        direction = "ASC"
+    elif re.search(DESCENDING_WORDS, rest):
+        direction = "DESC"
+    else:
+        direction = None
+    rest = re.sub(ASCENDING_WORDS + "|" + DESCENDING_WORDS, " ", rest)
+
+    # Ranking words order the groups ("which color has the most stock" ->
+    # the single best group); a min / max of the metric itself is not
+    # something the SQL builder expresses
+    if direction:
+        if not dimension_matches:
+            return None
+        intent_order.update({
+            "order_by": "value",
+            "order_direction": direction,
+            "limit": intent_order.get("limit", 1),
+        })
+
+    # ---------- Time ----------
+    filters = {}
+    time_granularity = None
+
+    year = re.search(YEAR_PATTERN, rest)
+    if year:
+        filters["year"] = year.group(1)
+        time_granularity = "year"
+        rest = re.sub(YEAR_PATTERN, " ", rest)
+
+    quarter = re.search(QUARTER_PATTERN, rest)
+    if quarter:
+        filters["quarter"] = f"Q{quarter.group(1)}"
+        time_granularity = "quarter"
+        rest = re.sub(QUARTER_PATTERN, " ", rest)
+
+    # ---------- Confidence ----------
+    # Leftover words may be filter values ("Kurta") or phrasing we do
+    # not understand: let the LLM handle those.
+    leftover = [w for w in rest.split() if w not in FILLER_WORDS]
+    if leftover:
+        return None
+
+    if not (aggregation or direction or dimension_matches):
+        return None
+
+    # "how many SKUs", "number of colors": a distinct count of a
+    # dimension, not a count of metric values per group
+    if aggregation == "count" and not metric_matches:
+        return None
+
+    if metric_matches:
+        metric = metric_matches[0]
+    elif len(metrics) == 1:
+        metric = metrics[0]
+    else:
+        return None
+
+    return {
+        "metric": metric,
+        "aggregation": aggregation or "sum",
+        "group_by": dimension_matches,
+        "filters": filters,
+        "time_granularity": time_granularity,
+        "comparison": None,
+        **intent_order,
+    }
+
+
+def parse_intent_rules(user_input: str, semantic_schema: dict):
+    """
+    Deterministic intent for common question shapes, or None when the
+    question needs the LLM intent agent.
+    """
+    intent = _parse(user_input, semantic_schema)
+
+    with _stats_lock:
+        _stats["hits" if intent is not None else "misses"] += 1
+
+    return intent
+
+
+def get_rule_parser_stats() -> dict:
+    """
+    Hits are questions answered without the LLM intent call.
+    """
+    with _stats_lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+            "llm_calls_saved": _stats["hits"],
+        }
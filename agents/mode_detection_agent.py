@@ -1,36 +1,65 @@
-from pathlib import Path
-from config.llm_config import get_openai_client
+from core.llm_gateway import achat_completion, chat_completion
+from core.prompts import build_messages
 
-client = get_openai_client()
-PROMPT_PATH = Path("prompts/mode_detection_prompt.txt")
+PROMPT_NAME = "mode_detection_prompt"
 
 SUMMARY_KEYWORDS = [
     "summary", "summarize", "overview", "performance",
     "insights", "trend", "high level", "overall"
 ]
 
-def detect_mode(user_input: str) -> str:
+def detect_mode_rules(user_input: str):
+    """
+    Rule-based fast path. Returns None when the LLM has to decide.
+    """
     text = user_input.lower()
 
-    # Rule-based fast path
     if any(keyword in text for keyword in SUMMARY_KEYWORDS):
         return "summarization"
 
-    # LLM fallback
-    system_prompt = PROMPT_PATH.read_text()
+    return None
 
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_input}
-        ],
-        temperature=0
-    )
 
+def build_mode_messages(user_input: str) -> list:
+    return build_messages(PROMPT_NAME, user_input)
+
+
+def parse_mode_response(response) -> str:
     mode = response.choices[0].message.content.strip()
 
     if mode not in ["summarization", "qa"]:
         raise ValueError(f"Invalid mode returned by LLM: {mode}")
 
     return mode
+
+
+def detect_mode(user_input: str) -> str:
+    # Rule-based fast path
+    mode = detect_mode_rules(user_input)
+    if mode:
+        return mode
+
+    # LLM fallback
+    response = chat_completion(
+        model="gpt-4.1-mini",
+        messages=build_mode_messages(user_input),
+        temperature=0,
+        agent="mode_detection"
+    )
+
+    return parse_mode_response(response)
+
+
+async def detect_mode_async(user_input: str) -> str:
+    mode = detect_mode_rules(user_input)
+    if mode:
+        return mode
+
+    response = await achat_completion(
+        model="gpt-4.1-mini",
+        messages=build_mode_messages(user_input),
+        temperature=0,
+        agent="mode_detection"
+    )
+
+    return parse_mode_response(response)
@@ -0,0 +1,195 @@
+import asyncio
+import contextlib
+import time
+
+from agents.mode_detection_agent import detect_mode_async, detect_mode_rules
+from agents.intent_extraction_agent import extract_query_intent_async
+from agents.intent_merge import merge_with_previous_intent
+from agents.data_extraction_agent import execute_query
+from agents.query_router import route_query
+from agents.validation_reasoning_agent import apply_business_reasoning, reasoning_intent
+from agents.explanation_agent import generate_explanation_async
+from agents.summarization_agent import (
+    build_summary_query,
+    assemble_summary_results,
+)
+from agents.time_followup_resolver import resolve_time_followup
+
+
+async def run_query_async(con, sql: str, params: list = None, fetch: str = "df"):
+    """
+    Run a query in a worker thread on that thread's own cursor,
+    so the event loop stays free for LLM calls.
+    """
+    return await asyncio.to_thread(execute_query, con, sql, params, fetch)
+
+
+async def summarize_async(semantic_schema: dict, con, table_name: str = "sales") -> dict:
+    """
+    All summary facts from one GROUPING SETS query (a single table scan).
+    """
+    sql, params = build_summary_query(semantic_schema, table_name)
+    if sql is None:
+        return {}
+
+    result_df = await run_query_async(con, sql, params)
+    return assemble_summary_results(result_df, semantic_schema)
+
+
+async def analyze_question_async(user_input: str, semantic_schema: dict, con, memory, table_name: str = "sales", value_index=None) -> dict:
+    """
+    Mode detection, intent extraction, SQL and reasoning for one question.
+    When the mode needs an LLM call, intent extraction starts at the same
+    time and its result is thrown away if the question is a summary.
+    With a value index, filter values are mapped to stored values first.
+    Wall-clock seconds per stage are reported in "timings"; intent
+    extraction that overlaps mode detection only counts the extra wait.
+    """
+    timings = {}
+    clock = [time.perf_counter()]
+
+    def mark(stage):
+        now = time.perf_counter()
+        timings[stage] = round(now - clock[0], 4)
+        clock[0] = now
+
+    mode = detect_mode_rules(user_input)
+    intent_task = None
+
+    if mode is None:
+        intent_task = asyncio.create_task(
+            extract_query_intent_async(user_input, semantic_schema)
+        )
+        try:
+            mode = await detect_mode_async(user_input)
+        except BaseException:
+            intent_task.cancel()
+            raise
+    mark("mode")
+
+    # ===========================
+    # SUMMARIZATION MODE
+    # ===========================
+    if mode == "summarization":
+        if intent_task is not None:
+            intent_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await intent_task
+
+        facts = await summarize_async(semantic_schema, con, table_name)
+        mark("query")
+        return {"mode": mode, "status": "success", "facts": facts, "timings": timings}
+
+    # ===========================
+    # Q&A MODE
+    # ===========================
+    if intent_task is None:
+        intent_task = asyncio.create_task(
+            extract_query_intent_async(user_input, semantic_schema)
+        )
+    intent_response = await intent_task
+    mark("intent")
+
+    if intent_response.get("status") != "valid":
+        return {
+            "mode": mode,
+            "status": "invalid",
+            "reason": intent_response.get("reason", ""),
+            "suggestion": intent_response.get("suggestion", ""),
+            "timings": timings,
+        }
+
+    merged_intent = merge_with_previous_intent(
+        intent_response["intent"],
+        memory.get_last_intent()
+    )
+    merged_intent["time_fields"] = semantic_schema.get("time_fields", [])
+    merged_intent["time_columns"] = semantic_schema.get("time_columns", {})
+    merged_intent["clean_metrics"] = semantic_schema.get("clean_metrics", [])
+
+    merged_intent = resolve_time_followup(user_input, merged_intent, semantic_schema)
+
+    if value_index is not None:
+        # year / quarter / month are resolved against the date or partition
+        # columns when SQL is built, not matched as dimension values
+        time_columns = merged_intent["time_columns"]
+        filters, unmatched = value_index.resolve_filters(
+            merged_intent.get("filters") or {},
+            skip={"year", "quarter", "month", *time_columns, *time_columns.values()},
+        )
+
+        # No stored value can match: answer without scanning the table
+        if unmatched:
+            message = unmatched_filter_message(value_index, unmatched)
+            return {
+                "mode": mode,
+                "status": "no_data",
+                "facts": {"status": "no_data", "message": message},
+                "intent": merged_intent,
+                "sql": None,
+                "message": message,
+                "timings": timings,
+            }
+
+        merged_intent["filters"] = filters
+
+    memory.update_intent(merged_intent)
+
+    # Fetch only the rows the reasoning step reports
+    sql, params = route_query(con, reasoning_intent(merged_intent), table_name)
+    result = await run_query_async(con, sql, params, fetch="numpy")
+    mark("query")
+    reasoning = apply_business_reasoning(merged_intent, result)
+    mark("reasoning")
+
+    return {
+        "mode": mode,
+        "status": reasoning.get("status"),
+        "facts": reasoning,
+        "intent": merged_intent,
+        "sql": sql,
+        "params": params,
+        "message": reasoning.get("message"),
+        "timings": timings,
+    }
+
+
+async def answer_question_async(user_input: str, semantic_schema: dict, con, memory, table_name: str = "sales", value_index=None) -> dict:
+    """
+    Full pipeline: analysis followed by the LLM explanation.
+    The result carries the final text under "answer".
+    """
+    result = await analyze_question_async(user_input, semantic_schema, con, memory, table_name, value_index)
+
+    started = time.perf_counter()
+    answer = direct_answer(result)
+    if answer is None:
+        answer = await generate_explanation_async(user_input, result["facts"])
+        result["timings"]["explanation"] = round(time.perf_counter() - started, 4)
+
+    result["answer"] = answer
+    return result
+
+
+def direct_answer(result: dict):
+    """
+    Text for results that need no LLM explanation, else None.
+    """
+    if result["status"] == "invalid":
+        return result["reason"] + "\n\n" + result["suggestion"]
+
+    if result["status"] != "success":
+        return result.get("message") or "No data available for the given query."
+
+    return None
+
+
+def unmatched_filter_message(value_index, unmatched: dict) -> str:
+    lines = []
+    for column, value in unmatched.items():
+        line = f"No {column} matches '{value}'."
+        suggestions = value_index.suggestions(column, value)
+        if suggestions:
+            line += " Did you mean: " + ", ".join(suggestions) + "?"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,118 @@
+from agents.data_extraction_agent import ORDER_DIRECTIONS, build_query
+from core.partitions import parse_time_value
+from core.rollups import get_rollups, metric_columns
+from core.typed_table import DERIVED_TIME_COLUMNS
+from db.duckdb_conn import get_connection_state, quote_identifier
+
+TIME_KEYS = ["year", "quarter", "month"]
+ROLLUP_AGGREGATIONS = ["sum", "avg", "count"]
+
+
+def route_query(con, intent: dict, table_name: str = "sales"):
+    """
+    (sql, params) for an intent: from the smallest rollup that can answer
+    it when rollups were built, else from the base table.
+    """
+    registry = get_rollups(con)
+    if registry:
+        routed = build_rollup_query(registry, intent)
+        with get_connection_state(con)["lock"]:
+            registry["hits" if routed else "misses"] += 1
+        if routed:
+            return routed
+
+    return build_query(intent, table_name)
+
+
+def rollup_filters(intent: dict):
+    """
+    Dimension filters and parsed time filters of an intent, or None when
+    a time value cannot be parsed (the base query handles those).
+    """
+    filters = intent.get("filters") or {}
+    has_time = intent.get("time_fields") or intent.get("time_columns")
+    dimension_filters = {}
+    time_filters = {}
+
+    for col, val in filters.items():
+        if col in TIME_KEYS:
+            # Same rule as the base query: ignored without time fields
+            if not has_time:
+                continue
+            value = parse_time_value(col, val)
+            if value is None:
+                return None
+            time_filters[col] = value
+        else:
+            dimension_filters[col] = val
+
+    return dimension_filters, time_filters
+
+
+def build_rollup_query(registry: dict, intent: dict):
+    metric = intent.get("metric")
+    aggregation = intent.get("aggregation")
+    group_by = intent.get("group_by") or []
+
+    if (
+        metric not in registry["metrics"]
+        or aggregation not in ROLLUP_AGGREGATIONS
+        or intent.get("comparison")
+    ):
+        return None
+
+    filters = rollup_filters(intent)
+    if filters is None:
+        return None
+    dimension_filters, time_filters = filters
+
+    needed_dimensions = set(group_by) | set(dimension_filters)
+    candidates = [
+        rollup for rollup in registry["tables"]
+        if needed_dimensions <= set(rollup["dimensions"])
+        and set(time_filters) <= set(rollup["time_levels"])
+    ]
+    if not candidates:
+        return None
+
+    rollup = min(candidates, key=lambda r: r["rows"])
+    parts = {key: quote_identifier(col) for key, col in metric_columns(metric).items()}
+
+    if aggregation == "sum":
+        value_sql = f"SUM({parts['sum']})"
+    elif aggregation == "avg":
+        value_sql = f"SUM({parts['sum']}) / NULLIF(SUM({parts['numeric_count']}), 0)"
+    else:
+        value_sql = f"CAST(COALESCE(SUM({parts['count']}), 0) AS BIGINT)"
+
+    params = []
+    quoted_group_by = [quote_identifier(col) for col in group_by]
+    select_clause = ", ".join(quoted_group_by + [f"{value_sql} AS value"])
+
+    where_clauses = []
+    for col, val in dimension_filters.items():
+        where_clauses.append(f"{quote_identifier(col)} = ?")
+        params.append(str(val))
+    for col, val in time_filters.items():
+        where_clauses.append(f"{DERIVED_TIME_COLUMNS[col]} = ?")
+        params.append(val)
+    for col in quoted_group_by:
+        where_clauses.append(f"{col} IS NOT NULL")
+
+    sql = f"SELECT {select_clause} FROM {quote_identifier(rollup['table'])}"
+    if where_clauses:
+        sql += f" WHERE {' AND '.join(where_clauses)}"
+    if quoted_group_by:
+        sql += f" GROUP BY {', '.join(quoted_group_by)}"
+        if aggregation in ["sum", "avg"]:
+            sql += f" HAVING SUM({parts['sum']}) > 0"
+
+    if intent.get("order_by") == "value":
+        direction = str(intent.get("order_direction") or "ASC").upper()
+        sql += f" ORDER BY value {direction if direction in ORDER_DIRECTIONS else 'ASC'}"
+
+    if intent.get("limit"):
+        sql += " LIMIT ?"
+        params.append(int(intent["limit"]))
+
+    return sql, params
@@ -1,68 +1,107 @@
-import pandas as pd
+from agents.data_extraction_agent import safe_numeric_expr
+from agents.validation_reasoning_agent import normalize_value
+from config.data_config import get_summary_settings
+from db.duckdb_conn import quote_identifier, quote_literal
 
-def generate_summary_intents(semantic_schema: dict):
+OVERALL_SET = "__overall"
+SET_COLUMN = "__grouping_set"
+COUNT_COLUMN = "__group_count"
+
+
+def summary_dimensions(semantic_schema: dict) -> list:
     """
-    Generate safe summary intents.
-    IMPORTANT: No implicit time filters.
+    SUMMARY_DIMENSIONS when set (unknown names are ignored),
+    else the first few dimensions of the schema.
     """
-    metrics = semantic_schema.get("metrics", [])
+    settings = get_summary_settings()
     dimensions = semantic_schema.get("dimensions", [])
 
+    if settings["dimensions"]:
+        return [d for d in settings["dimensions"] if d in dimensions]
+
+    return dimensions[:settings["max_dimensions"]]
+
+
+def build_summary_query(semantic_schema: dict, table_name: str = "sales"):
+    """
+    Overall totals and per-dimension breakdowns of every metric in one
+    scan (GROUPING SETS), keeping the top N groups of each dimension by
+    the primary metric. Returns (sql, params), or (None, []) without metrics.
+    IMPORTANT: No implicit time filters.
+    """
+    metrics = semantic_schema.get("metrics", [])
     if not metrics:
-        return []
-
-    primary_metric = metrics[0]
-
-    intents = [
-        {
-            "name": "overall_metric",
-            "intent": {
-                "metric": primary_metric,
-                "aggregation": "sum",
-                "group_by": [],
-                "filters": {},
-                "time_granularity": None,
-                "comparison": None
-            }
-        }
-    ]
+        return None, []
+
+    dimensions = summary_dimensions(semantic_schema)
+    quoted_dims = [quote_identifier(d) for d in dimensions]
+    primary = quote_identifier(metrics[0])
+    clean = set(semantic_schema.get("clean_metrics", []))
 
-    if dimensions:
-        intents.append(
-            {
-                "name": "by_primary_dimension",
-                "intent": {
-                    "metric": primary_metric,
-                    "aggregation": "sum",
-                    "group_by": [dimensions[0]],
-                    "filters": {},
-                    "time_granularity": None,
-                    "comparison": None
-                }
-            }
-        )
+    metric_sql = ", ".join(
+        f"SUM({safe_numeric_expr(quote_identifier(m), m in clean)}) AS {quote_identifier(m)}"
+        for m in metrics
+    )
+    set_sql = (
+        "CASE "
+        + " ".join(f"WHEN GROUPING({q}) = 0 THEN {quote_literal(d)}" for q, d in zip(quoted_dims, dimensions))
+        + f" ELSE '{OVERALL_SET}' END"
+        if dimensions else f"'{OVERALL_SET}'"
+    )
+    grouping_sets = ", ".join(["()"] + [f"({q})" for q in quoted_dims])
+    select_dims = "".join(f"{q}, " for q in quoted_dims)
 
-    return intents
+    # In a dimension's set the other dimensions are NULL, so all-NULL
+    # means the group itself is NULL (same as "IS NOT NULL" per query)
+    group_not_null = (
+        "NOT (" + " AND ".join(f"{q} IS NULL" for q in quoted_dims) + ")"
+        if quoted_dims else "FALSE"
+    )
+
+    sql = f"""
+    SELECT *, COUNT(*) OVER (PARTITION BY {SET_COLUMN}) AS {COUNT_COLUMN}
+    FROM (
+        SELECT {select_dims}{set_sql} AS {SET_COLUMN}, {metric_sql}
+        FROM {quote_identifier(table_name)}
+        GROUP BY GROUPING SETS ({grouping_sets})
+    )
+    WHERE {SET_COLUMN} = '{OVERALL_SET}' OR ({group_not_null} AND {primary} > 0)
+    QUALIFY {SET_COLUMN} = '{OVERALL_SET}'
+        OR ROW_NUMBER() OVER (PARTITION BY {SET_COLUMN} ORDER BY {primary} DESC) <= ?
+    ORDER BY {SET_COLUMN}, {primary} DESC
+    """
 
+    return sql.strip(), [get_summary_settings()["top_n"]]
 
 
-def assemble_summary_results(results: dict) -> dict:
+def assemble_summary_results(result_df, semantic_schema: dict) -> dict:
     """
-    Assemble summary facts from executed summary queries.
+    Unpack the single GROUPING SETS result into summary facts:
+    "overall" (every metric) and "by_<dimension>" (top SUMMARY_TOP_N
+    groups by the primary metric + group count). Breakdowns carry only
+    the primary metric, so the explanation prompt does not grow with the
+    number of metrics.
     Fully dynamic, schema-safe, and dataset-agnostic.
     """
     summary = {}
 
-    for name, df in results.items():
-        if df is None or df.empty:
-            continue
+    if result_df is None or result_df.empty:
+        return summary
 
-        # Case 1: Single aggregated value (no group_by)
-        if df.shape[1] == 1:
-            summary[name] = df.iloc[0]["value"]
+    metrics = semantic_schema.get("metrics", [])
 
-        # Case 2: Grouped aggregation (by category, region, etc.)
-        else:
-            summary[name] = df.to_dict(orient="records")
+    for set_name, rows in result_df.groupby(SET_COLUMN, sort=False):
+        if set_name == OVERALL_SET:
+            overall = rows.iloc[0]
+            summary["overall"] = {m: normalize_value(overall[m]) for m in metrics}
+            continue
+
+        summary[f"by_{set_name}"] = {
+            "top": [
+                {set_name: normalize_value(group), metrics[0]: normalize_value(value)}
+                for group, value in zip(rows[set_name], rows[metrics[0]])
+            ],
+            "count": int(rows.iloc[0][COUNT_COLUMN]),
+        }
 
     return summary
@@ -1,27 +1,31 @@
 def resolve_time_followup(user_input: str, intent: dict, semantic_schema: dict) -> dict:
     """
-    Handles follow-up time queries like 'And in Q4?' or 'What about 2023?'
+    Handles follow-up time queries like 'And in Q4?', 'What about 2023?'
+    or 'What about Q4 2023?'
     """
     text = user_input.lower()
 
-    # Only act if dataset supports time
-    if not semantic_schema.get("time_fields"):
+    # Only act if dataset supports time (a date column or partition columns)
+    if not (semantic_schema.get("time_fields") or semantic_schema.get("time_columns")):
         return intent
 
     # Quarter detection
-    for q in ["q1", "q2", "q3", "q4"]:
-        if q in text:
-            intent["filters"] = intent.get("filters", {})
-            intent["filters"]["quarter"] = q.upper()
-            intent["time_granularity"] = "quarter"
-            return intent
+    quarter = next((q for q in ["q1", "q2", "q3", "q4"] if q in text), None)
 
     # Year detection
-    for year in range(2000, 2035):
-        if str(year) in text:
-            intent["filters"] = intent.get("filters", {})
-            intent["filters"]["year"] = str(year)
-            intent["time_granularity"] = "year"
-            return intent
+    year = next((y for y in range(2000, 2035) if str(y) in text), None)
+
+    if quarter is None and year is None:
+        return intent
+
+    intent["filters"] = intent.get("filters", {})
+
+    if year is not None:
+        intent["filters"]["year"] = str(year)
+        intent["time_granularity"] = "year"
+
+    if quarter is not None:
+        intent["filters"]["quarter"] = quarter.upper()
+        intent["time_granularity"] = "quarter"
 
     return intent
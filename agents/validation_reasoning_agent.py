@@ -1,8 +1,21 @@
+import re
+
+import numpy as np
 import pandas as pd
 
+from agents.intent_rule_parser import ASCENDING_WORDS, DESCENDING_WORDS, normalize_text
+
+# Insight -> sort direction of "value" that puts the reported row first
+RANKING_INSIGHTS = {"underperformed": "ASC", "top_performer": "DESC"}
+PREVIEW_ROWS = 5
+
 
 def normalize_value(value):
     """Convert numpy / pandas scalars to native Python types."""
+    if value is np.ma.masked:
+        return None
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value)
     try:
         return value.item()
     except AttributeError:
@@ -14,46 +27,100 @@ def row_to_native_dict(row: pd.Series) -> dict:
     return {k: normalize_value(v) for k, v in row.to_dict().items()}
 
 
-def apply_business_reasoning(intent: dict, result_df: pd.DataFrame) -> dict:
-    if result_df is None or result_df.empty:
-        return {
-            "status": "no_data",
-            "message": "No data available for the given query."
-        }
+def result_columns(result) -> dict:
+    """
+    Column name -> array for a DataFrame or a NumPy fetch
+    (execute_query(..., fetch="numpy")); no per-row conversion.
+    """
+    if result is None:
+        return {}
+    if isinstance(result, pd.DataFrame):
+        return {col: result[col].to_numpy() for col in result.columns}
+    return result
+
+
+def row_at(columns: dict, index: int) -> dict:
+    """JSON-safe dict of one row."""
+    return {col: normalize_value(values[index]) for col, values in columns.items()}
+
+
+def ranking_insight(intent: dict):
+    """
+    "underperformed" / "top_performer" when the question asks for the
+    lowest / best group ("least", "most", "max", ... as in the rule
+    parser), else None.
+    """
+    question = normalize_text(intent.get("original_question", ""))
+
+    if re.search(ASCENDING_WORDS, question):
+        return "underperformed"
+
+    if re.search(DESCENDING_WORDS, question):
+        return "top_performer"
+
+    return None
 
-    question = intent.get("original_question", "").lower()
 
-    # ---------- UNDERPERFORMED ----------
-    if "underperform" in question or "lowest" in question:
-        sorted_df = result_df.sort_values(by="value", ascending=True)
-        worst_row = sorted_df.iloc[0]
+def extreme_index(values, insight: str) -> int:
+    """
+    Row with the lowest / highest value; NULL and NaN values rank last.
+    """
+    numbers = np.ma.masked_invalid(np.ma.asarray(values, dtype=float))
+    if numbers.count() == 0:
+        return 0
+    return int(numbers.argmin() if insight == "underperformed" else numbers.argmax())
 
+
+def apply_business_reasoning(intent: dict, result) -> dict:
+    """
+    `result` is a DataFrame or NumPy columns. Queries built from
+    reasoning_intent arrive already ordered / limited in SQL, so only a
+    handful of rows are inspected.
+    """
+    columns = result_columns(result)
+    row_count = len(next(iter(columns.values()))) if columns else 0
+
+    if row_count == 0:
         return {
-            "status": "success",
-            "insight_type": "underperformed",
-            "row": row_to_native_dict(worst_row)
+            "status": "no_data",
+            "message": "No data available for the given query."
         }
 
-    # ---------- TOP PERFORMER ----------
-    if "top" in question or "best" in question or "highest" in question:
-        sorted_df = result_df.sort_values(by="value", ascending=False)
-        best_row = sorted_df.iloc[0]
-
+    # ---------- UNDERPERFORMED / TOP PERFORMER ----------
+    insight = ranking_insight(intent)
+    if insight is not None:
         return {
             "status": "success",
-            "insight_type": "top_performer",
-            "row": row_to_native_dict(best_row)
+            "insight_type": insight,
+            "row": row_at(columns, extreme_index(columns["value"], insight))
         }
 
     # ---------- DEFAULT (SAFE FALLBACK) ----------
     # Return aggregated preview, NOT full DataFrame
-    preview_rows = []
-
-    for _, row in result_df.head(5).iterrows():
-        preview_rows.append(row_to_native_dict(row))
-
     return {
         "status": "success",
         "insight_type": "summary",
-        "data": preview_rows
+        "data": [row_at(columns, i) for i in range(min(PREVIEW_ROWS, row_count))]
+    }
+
+
+def reasoning_intent(intent: dict) -> dict:
+    """
+    Copy of the intent whose query returns only the rows
+    apply_business_reasoning reads: ranking questions are ordered by value
+    and limited (the requested N, else 1); other group-bys are limited to
+    the preview. Intents without group_by are returned unchanged.
+    """
+    if not intent.get("group_by"):
+        return intent
+
+    insight = ranking_insight(intent)
+    if insight is None:
+        return {**intent, "limit": intent.get("limit") or PREVIEW_ROWS}
+
+    return {
+        **intent,
+        "order_by": "value",
+        "order_direction": RANKING_INSIGHTS[insight],
+        "limit": intent.get("limit") or 1,
     }
@@ -6,22 +6,18 @@ from core.file_detector import detect_file_type
 from core.loader import load_data
 from core.profiler import profile_input
 from core.semantic_schema import generate_semantic_schema
+from core.value_index import build_value_index
+from core.rollups import build_rollups
+from core.typed_table import build_typed_table
+from core.llm_gateway import run_async
+from config.data_config import get_rollup_settings
 
 from db.duckdb_conn import create_duckdb_connection
 
-from agents.mode_detection_agent import detect_mode
-from agents.intent_extraction_agent import extract_query_intent
-from agents.intent_merge import merge_with_previous_intent
-from agents.data_extraction_agent import build_sql_query, execute_query
-from agents.validation_reasoning_agent import apply_business_reasoning
-from agents.explanation_agent import generate_explanation
-from agents.summarization_agent import (
-    generate_summary_intents,
-    assemble_summary_results,
-)
+from agents.pipeline import analyze_question_async, direct_answer
+from agents.explanation_agent import stream_explanation
 
 from memory.conversation_memory import ConversationMemory
-from agents.time_followup_resolver import resolve_time_followup
 
 
 # --------------------------------------------------
@@ -51,6 +47,9 @@ if "semantic_schema" not in st.session_state:
 if "db_conn" not in st.session_state:
     st.session_state.db_conn = None
 
+if "value_index" not in st.session_state:
+    st.session_state.value_index = None
+
 
 # --------------------------------------------------
 # Dataset Upload (TOP)
@@ -72,6 +71,13 @@ if uploaded_file:
 
         st.session_state.semantic_schema = semantic_schema
         st.session_state.db_conn = create_duckdb_connection(raw_data)
+        build_typed_table(st.session_state.db_conn, semantic_schema)
+        st.session_state.value_index = build_value_index(
+            st.session_state.db_conn,
+            semantic_schema.get("dimensions", [])
+        )
+        if get_rollup_settings()["enabled"]:
+            build_rollups(st.session_state.db_conn, semantic_schema)
 
     st.success("Dataset loaded successfully. You can start chatting 👇")
 
@@ -104,76 +110,31 @@ if st.session_state.semantic_schema:
             {"role": "user", "content": user_input}
         )
 
-        with st.spinner("Analyzing..."):
-            mode = detect_mode(user_input)
-
-            # ===========================
-            # SUMMARIZATION MODE
-            # ===========================
-            if mode == "summarization":
-                summary_intents = generate_summary_intents(
-                    st.session_state.semantic_schema
-                )
-
-                results = {}
-                for item in summary_intents:
-                    sql = build_sql_query(item["intent"], "sales")
-                    results[item["name"]] = execute_query(
-                        st.session_state.db_conn, sql
-                    )
-
-                summary_facts = assemble_summary_results(results)
+        with chat_container:
+            with st.chat_message("user"):
+                st.write(user_input)
 
-                answer = generate_explanation(
+        with st.spinner("Analyzing..."):
+            # Mode detection and intent extraction run concurrently
+            result = run_async(
+                analyze_question_async(
                     user_input,
-                    summary_facts
+                    st.session_state.semantic_schema,
+                    st.session_state.db_conn,
+                    st.session_state.memory,
+                    value_index=st.session_state.value_index
                 )
+            )
 
-            # ===========================
-            # Q&A MODE
-            # ===========================
-            else:
-                intent_response = extract_query_intent(
-                    user_input,
-                    st.session_state.semantic_schema
-                )
+        answer = direct_answer(result)
 
-                if intent_response.get("status") != "valid":
-                    answer = (
-                        intent_response.get("reason", "")
-                        + "\n\n"
-                        + intent_response.get("suggestion", "")
-                    )
-                else:
-                    current_intent = intent_response["intent"]
-
-                    merged_intent = merge_with_previous_intent(
-                        current_intent,
-                        st.session_state.memory.get_last_intent()
-                    )
-
-                    merged_intent = resolve_time_followup(
-                        user_input,
-                        merged_intent,
-                        st.session_state.semantic_schema
-                    )
-
-                    st.session_state.memory.update_intent(merged_intent)
-
-                    sql = build_sql_query(merged_intent, "sales")
-                    result_df = execute_query(
-                        st.session_state.db_conn, sql
-                    )
-
-                    reasoning = apply_business_reasoning(
-                        merged_intent,
-                        result_df
-                    )
-
-                    answer = generate_explanation(
-                        user_input,
-                        reasoning
-                    )
+        if answer is None:
+            # Stream the explanation token by token
+            with chat_container:
+                with st.chat_message("assistant"):
+                    answer = st.write_stream(
+                        stream_explanation(user_input, result["facts"])
+                    ).strip()
 
         # Add assistant message
         st.session_state.chat_history.append(
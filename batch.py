@@ -0,0 +1,154 @@
+"""
+Batch mode: run a file of questions against one dataset and write
+one JSON result per line.
+
+Usage:
+    python batch.py questions.txt --data "data/P  L March 2021.csv" --out results.jsonl --concurrency 8
+
+Questions are read one per line; blank lines and lines starting with
+"#" are skipped. Each question gets its own conversation memory, so
+follow-ups are not resolved across lines.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import pandas as pd
+
+from core.file_detector import detect_file_type
+from core.loader import load_data
+from core.profiler import profile_input
+from core.semantic_schema import generate_semantic_schema
+from core.value_index import build_value_index
+from core.rollups import build_rollups
+from core.typed_table import build_typed_table
+from core.llm_gateway import run_async
+
+from config.data_config import get_rollup_settings
+
+from db.duckdb_conn import DuckDBDataset, create_duckdb_connection, query_memory_stats
+
+from agents.pipeline import answer_question_async
+
+from memory.conversation_memory import ConversationMemory
+
+TABLE_NAME = "sales"
+
+
+def read_questions(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+def load_dataset(path: str, table_name: str = TABLE_NAME) -> dict:
+    """
+    Same setup as main.py: load, profile, schema, connection, typed
+    table, value index and (when enabled) rollups.
+    """
+    file_type = detect_file_type(path)
+    raw_data = load_data(path, file_type)
+
+    if not isinstance(raw_data, (pd.DataFrame, DuckDBDataset)):
+        raise ValueError("Batch mode supports tabular datasets only (CSV / Excel / Parquet).")
+
+    profile = profile_input(raw_data)
+    semantic_schema = generate_semantic_schema(profile)
+    con = create_duckdb_connection(raw_data)
+    build_typed_table(con, semantic_schema, table_name)
+
+    if get_rollup_settings()["enabled"]:
+        build_rollups(con, semantic_schema, table_name)
+
+    return {
+        "profile": profile,
+        "semantic_schema": semantic_schema,
+        "con": con,
+        "value_index": build_value_index(con, semantic_schema.get("dimensions", []), table_name),
+    }
+
+
+async def answer_one(index: int, question: str, dataset: dict, semaphore, table_name: str = TABLE_NAME) -> dict:
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await answer_question_async(
+                question,
+                dataset["semantic_schema"],
+                dataset["con"],
+                ConversationMemory(),
+                table_name,
+                dataset["value_index"],
+            )
+            record = {
+                "index": index,
+                "question": question,
+                "mode": result["mode"],
+                "status": result["status"],
+                "answer": result["answer"],
+                "sql": result.get("sql"),
+                "params": result.get("params"),
+                "facts": result.get("facts"),
+                "timings": result.get("timings", {}),
+            }
+        except Exception as e:
+            record = {"index": index, "question": question, "status": "error", "error": str(e)}
+
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        return record
+
+
+async def run_batch(questions: list, dataset: dict, out_path: str, concurrency: int = 8, table_name: str = TABLE_NAME) -> dict:
+    """
+    Answer all questions with at most `concurrency` in flight; results are
+    written as they complete. LLM calls overlap on the async client and
+    queries run on per-thread cursors of the shared connection.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    statuses = {}
+
+    tasks = [
+        asyncio.create_task(answer_one(i, q, dataset, semaphore, table_name))
+        for i, q in enumerate(questions)
+    ]
+
+    with open(out_path, "w", encoding="utf-8") as out:
+        for task in asyncio.as_completed(tasks):
+            record = await task
+            statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    summary = {
+        "questions": len(questions),
+        "statuses": statuses,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+    }
+    if query_memory_stats(dataset["con"]) is not None:
+        summary["query_memory"] = query_memory_stats(dataset["con"])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of questions in batch.")
+    parser.add_argument("questions", help="text file, one question per line")
+    parser.add_argument("--data", required=True, help="dataset path (file, glob or directory)")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL output path")
+    parser.add_argument("--concurrency", type=int, default=8, help="questions in flight at once")
+    args = parser.parse_args()
+
+    questions = read_questions(args.questions)
+    print(f"🔹 Loading dataset {args.data} ...")
+    dataset = load_dataset(args.data)
+
+    print(f"🔹 Answering {len(questions)} questions (concurrency {args.concurrency}) ...")
+    summary = run_async(run_batch(questions, dataset, args.out, args.concurrency))
+
+    print(f"✅ Wrote {args.out}: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Synthetic retail sales data at benchmark scale (1M - 100M+ rows).
+
+Rows are generated inside DuckDB from range() and COPYed straight to
+CSV or Parquet, so memory stays flat regardless of row count. Every
+value is a hash of (row number, seed): the same arguments always
+produce the same rows (row order may vary between multi-threaded runs).
+
+Usage:
+    python benchmarks/generate_dataset.py data/synthetic.parquet --rows 10000000
+    python benchmarks/generate_dataset.py data/synthetic.csv --rows 1000000 --skus 20000 --dirty-rate 0.01
+"""
+import argparse
+import time
+from pathlib import Path
+
+import duckdb
+
+BASE_CATEGORIES = [
+    "Kurta", "Set", "Top", "Dupatta", "Saree", "Western Dress",
+    "Ethnic Dress", "Blouse", "Bottom", "Lehenga",
+]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "3XL", "Free"]
+COLORS = [
+    "Red", "Blue", "Green", "Black", "White", "Pink", "Yellow",
+    "Maroon", "Navy", "Beige", "Grey", "Orange",
+]
+# Values a hand-maintained spreadsheet tends to contain in numeric columns
+DIRTY_VALUES = ["N/A", "-", "n/a", "unknown", "1,024", " 12 "]
+
+
+def sql_list(values: list) -> str:
+    return "[" + ", ".join("'" + v.replace("'", "''") + "'" for v in values) + "]"
+
+
+def category_names(n: int) -> list:
+    return [
+        BASE_CATEGORIES[i] if i < len(BASE_CATEGORIES) else f"Category {i + 1}"
+        for i in range(n)
+    ]
+
+
+def dataset_sql(
+    rows: int,
+    skus: int = 5000,
+    categories: int = 5,
+    start_date: str = "2022-01-01",
+    days: int = 730,
+    dirty_rate: float = 0.0,
+    seed: int = 42,
+) -> str:
+    """
+    SELECT producing the synthetic table. Each SKU has a fixed category,
+    size, color and unit price; dates, stock and quantities vary per row.
+    """
+    sizes = len(SIZES)
+    colors = len(COLORS)
+    dirty_per_10k = int(dirty_rate * 10000)
+
+    def metric(name: str, expr: str) -> str:
+        if not dirty_per_10k:
+            return f"{expr} AS {name}"
+        return (
+            f"CASE WHEN hash(i, {seed}, '{name}') % 10000 < {dirty_per_10k} "
+            f"THEN {sql_list(DIRTY_VALUES)}[1 + CAST(hash(i, {seed}, '{name}x') % {len(DIRTY_VALUES)} AS INTEGER)] "
+            f"ELSE CAST({expr} AS VARCHAR) END AS {name}"
+        )
+
+    return f"""
+        WITH base AS (
+            SELECT
+                i,
+                CAST(hash(i, {seed}, 'sku') % {skus} AS BIGINT) AS sku_id
+            FROM range({rows}) t(i)
+        )
+        SELECT
+            i + 1 AS order_id,
+            DATE '{start_date}' + CAST(hash(i, {seed}, 'date') % {days} AS INTEGER) AS date,
+            'SKU-' || lpad(CAST(sku_id AS VARCHAR), {len(str(skus - 1))}, '0') AS sku,
+            {sql_list(category_names(categories))}[1 + CAST(sku_id % {categories} AS INTEGER)] AS category,
+            {sql_list(SIZES)}[1 + CAST((sku_id // {categories}) % {sizes} AS INTEGER)] AS size,
+            {sql_list(COLORS)}[1 + CAST((sku_id // {categories * sizes}) % {colors} AS INTEGER)] AS color,
+            {metric("stock", f"CAST(hash(i, {seed}, 'stock') % 500 AS INTEGER)")},
+            {metric("units_sold", f"CAST(1 + hash(i, {seed}, 'units') % 12 AS INTEGER)")},
+            {metric("amount", f"ROUND((1 + hash(i, {seed}, 'units') % 12) * (199 + (sku_id * 37) % 3000) * 1.0, 2)")}
+        FROM base
+    """
+
+
+def write_dataset(path, rows: int, file_format: str = None, memory_limit: str = "1GB", **options) -> Path:
+    """
+    Stream the synthetic table to `path` (CSV or Parquet, from the suffix
+    unless `file_format` is given). Extra options go to dataset_sql.
+    """
+    path = Path(path)
+    file_format = file_format or ("parquet" if path.suffix == ".parquet" else "csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    copy_options = (
+        "FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 122880"
+        if file_format == "parquet"
+        else "FORMAT CSV, HEADER, DELIMITER ','"
+    )
+
+    con = duckdb.connect(database=":memory:")
+    try:
+        con.execute(f"SET memory_limit = '{memory_limit}'")
+        con.execute("SET preserve_insertion_order = false")
+        escaped = path.as_posix().replace("'", "''")
+        con.execute(f"COPY ({dataset_sql(rows, **options)}) TO '{escaped}' ({copy_options})")
+    finally:
+        con.close()
+
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="output file (.csv or .parquet)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skus", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--days", type=int, default=730, help="date range length from --start-date")
+    parser.add_argument("--start-date", default="2022-01-01")
+    parser.add_argument("--dirty-rate", type=float, default=0.0, help="share of metric values replaced by junk strings")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None)
+    parser.add_argument("--memory-limit", default="1GB")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = write_dataset(
+        args.path,
+        args.rows,
+        file_format=args.format,
+        memory_limit=args.memory_limit,
+        skus=args.skus,
+        categories=args.categories,
+        start_date=args.start_date,
+        days=args.days,
+        dirty_rate=args.dirty_rate,
+        seed=args.seed,
+    )
+    elapsed = time.perf_counter() - start
+
+    size_mb = path.stat().st_size / 1024 / 1024
+    print(f"Wrote {args.rows:,} rows to {path} ({size_mb:.1f} MB) in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Startup-time benchmark: cost of importing the agent modules.
+
+"before" reproduces what importing used to do (load dotenv + openai and
+build one client per LLM module at import time); "after" imports the
+modules as they are now, with the shared client created lazily.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+AGENT_MODULES = [
+    "core.semantic_schema",
+    "agents.mode_detection_agent",
+    "agents.intent_extraction_agent",
+    "agents.explanation_agent",
+]
+
+TIMER = """
+import os, time
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+start = time.perf_counter()
+{body}
+print(time.perf_counter() - start)
+"""
+
+BEFORE = "\n".join(
+    ["from dotenv import load_dotenv", "from openai import OpenAI", "load_dotenv()"]
+    + [f"import {module}" for module in AGENT_MODULES]
+    + ["clients = [OpenAI(api_key=os.environ['OPENAI_API_KEY']) for _ in range(4)]"]
+)
+
+AFTER = "\n".join(f"import {module}" for module in AGENT_MODULES)
+
+
+def time_snippet(body: str, runs: int) -> list:
+    """Each run is a fresh interpreter, so nothing is cached in sys.modules."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(body=body)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, body in [("before (eager clients)", BEFORE), ("after (lazy gateway)", AFTER)]:
+        samples = time_snippet(body, args.runs)
+        print(
+            f"{label:<24} median {statistics.median(samples) * 1000:8.1f} ms"
+            f"   min {min(samples) * 1000:8.1f} ms   ({args.runs} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+End-to-end latency benchmark on synthetic data, fully offline.
+
+Runs the main.py flow (load, profile, schema, typed table, value index,
+then questions through the async pipeline) with the deterministic LLM
+stand-in and reports p50 / p95 per stage plus question throughput.
+
+Usage:
+    python benchmarks/pipeline_latency.py [--rows 10000 1000000] [--format csv]
+                                          [--latency-ms 200] [--repeat 5] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+os.chdir(REPO_ROOT)
+
+# Measure the real work, not the persistent caches
+os.environ["LLM_CACHE_PATH"] = ""
+os.environ["SCHEMA_STORE_PATH"] = ""
+os.environ.setdefault("LOADER_ENGINE", "duckdb")
+
+from agents.pipeline import answer_question_async  # noqa: E402
+from benchmarks.generate_dataset import write_dataset  # noqa: E402
+from core.file_detector import detect_file_type  # noqa: E402
+from core.llm_gateway import run_async, set_llm_client  # noqa: E402
+from core.loader import load_data  # noqa: E402
+from core.offline_llm import AsyncOfflineLLMClient, OfflineLLMClient  # noqa: E402
+from core.profiler import profile_input  # noqa: E402
+from core.semantic_schema import generate_semantic_schema  # noqa: E402
+from core.typed_table import build_typed_table  # noqa: E402
+from core.value_index import build_value_index  # noqa: E402
+from db.duckdb_conn import create_duckdb_connection  # noqa: E402
+from memory.conversation_memory import ConversationMemory  # noqa: E402
+
+QUESTIONS = [
+    "total stock by category",                     # rule-based intent
+    "top 5 sizes by units sold",                   # rule-based intent, ranking
+    "average amount per color",                    # rule-based intent
+    "how is stock spread over the colors?",        # LLM mode + intent
+    "which category sells best this season?",      # LLM mode + intent
+    "give me a summary of overall performance",    # summarization
+]
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(stages: dict, name: str, fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    stages.setdefault(name, []).append(time.perf_counter() - start)
+    return value
+
+
+async def run_questions(questions: list, schema: dict, con, value_index, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(question):
+        async with semaphore:
+            start = time.perf_counter()
+            result = await answer_question_async(
+                question, schema, con, ConversationMemory(), "sales", value_index
+            )
+            timings = dict(result.get("timings", {}))
+            timings["total"] = time.perf_counter() - start
+            return timings
+
+    return await asyncio.gather(*[run_one(q) for q in questions])
+
+
+def benchmark_dataset(path: Path, repeat: int, concurrency: int) -> dict:
+    stages = {}
+
+    file_type = detect_file_type(str(path))
+    data = timed(stages, "load_data", load_data, str(path), file_type)
+    profile = timed(stages, "profile_input", profile_input, data)
+    schema = timed(stages, "semantic_schema", generate_semantic_schema, profile)
+    con = create_duckdb_connection(data)
+    timed(stages, "typed_table", build_typed_table, con, schema)
+    value_index = timed(stages, "value_index", build_value_index, con, schema["dimensions"])
+
+    questions = QUESTIONS * repeat
+    wall_start = time.perf_counter()
+    results = run_async(run_questions(questions, schema, con, value_index, concurrency))
+    wall = time.perf_counter() - wall_start
+
+    for timings in results:
+        for stage, seconds in timings.items():
+            stages.setdefault(f"question.{stage}", []).append(seconds)
+
+    return {"stages": stages, "questions": len(questions), "wall": wall}
+
+
+def print_report(label: str, report: dict):
+    print(f"\n{label}")
+    print(f"  {'stage':<24}{'p50 ms':>10}{'p95 ms':>10}{'n':>6}")
+    for stage, samples in report["stages"].items():
+        print(
+            f"  {stage:<24}{percentile(samples, 50) * 1000:>10.1f}"
+            f"{percentile(samples, 95) * 1000:>10.1f}{len(samples):>6}"
+        )
+    print(
+        f"  throughput: {report['questions'] / report['wall']:.1f} questions/s "
+        f"({report['questions']} in {report['wall']:.2f} s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--dirty-rate", type=float, default=0.001)
+    parser.add_argument("--latency-ms", type=float, default=200, help="injected latency per LLM call")
+    parser.add_argument("--repeat", type=int, default=5, help="times the question set is asked")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    set_llm_client(OfflineLLMClient(latency), AsyncOfflineLLMClient(latency))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = write_dataset(Path(tmp) / f"sales_{rows}.{args.format}", rows, dirty_rate=args.dirty_rate)
+            report = benchmark_dataset(path, args.repeat, args.concurrency)
+            print_report(
+                f"{rows:,} rows ({args.format}), {args.latency_ms:g} ms / LLM call, concurrency {args.concurrency}",
+                report
+            )
+
+
+if __name__ == "__main__":
+    main()
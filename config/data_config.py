@@ -0,0 +1,140 @@
+import os
+
+from config.env import load_env
+
+
+def get_loader_engine() -> str:
+    """
+    Engine used to load tabular files.
+    "pandas" (default) reads into a DataFrame, "duckdb" scans the file natively.
+    """
+    load_env()
+    engine = os.getenv("LOADER_ENGINE", "pandas").strip().lower()
+
+    if engine not in ["pandas", "duckdb"]:
+        raise ValueError(f"Unsupported LOADER_ENGINE: {engine}")
+
+    return engine
+
+
+def get_duckdb_settings() -> dict:
+    """
+    DuckDB options for the native loader, read from the environment.
+    """
+    load_env()
+    materialize = os.getenv("DUCKDB_MATERIALIZE", "table").strip().lower()
+
+    if materialize not in ["table", "view"]:
+        raise ValueError(f"Unsupported DUCKDB_MATERIALIZE: {materialize}")
+
+    return {
+        # "table" copies the file into DuckDB once, "view" re-scans it per query
+        "materialize": materialize,
+        # Spill directory for out-of-core processing (None = DuckDB default)
+        "temp_directory": os.getenv("DUCKDB_TEMP_DIRECTORY") or None,
+        # e.g. "4GB"; data beyond this limit spills to temp_directory
+        "memory_limit": os.getenv("DUCKDB_MEMORY_LIMIT") or None,
+        # Cap on spilled data, e.g. "50GB" (None = DuckDB default, 90% of free disk)
+        "max_temp_directory_size": os.getenv("DUCKDB_MAX_TEMP_DIRECTORY_SIZE") or None,
+        # Worker threads per query (None = DuckDB default, one per core)
+        "threads": int(os.getenv("DUCKDB_THREADS")) if os.getenv("DUCKDB_THREADS") else None,
+        # Keep Parquet metadata in memory between scans of the same files
+        "object_cache": os.getenv("DUCKDB_OBJECT_CACHE", "true").strip().lower() in ["1", "true", "yes"],
+        # Record memory allocated / spilled per query (DuckDB profiling)
+        "profile_memory": os.getenv("DUCKDB_PROFILE_MEMORY", "false").strip().lower() in ["1", "true", "yes"],
+    }
+
+
+def get_parquet_cache_settings() -> dict:
+    """
+    Parquet conversion cache. Disabled unless PARQUET_CACHE_DIR is set.
+    """
+    load_env()
+    return {
+        "cache_dir": os.getenv("PARQUET_CACHE_DIR") or None,
+        "max_bytes": int(os.getenv("PARQUET_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+    }
+
+
+def get_profiler_settings() -> dict:
+    load_env()
+    return {
+        # Profile on a reservoir sample above this many rows (0 = always exact)
+        "sample_rows": int(os.getenv("PROFILE_SAMPLE_ROWS", "1000000")),
+        # Share of non-null values that must convert for a numeric metric
+        "min_numeric_ratio": float(os.getenv("PROFILE_MIN_NUMERIC_RATIO", "0.95")),
+    }
+
+
+def get_schema_store_settings() -> dict:
+    """
+    Semantic schema store. Set SCHEMA_STORE_PATH to an empty value to disable.
+    """
+    load_env()
+    return {
+        "path": os.getenv("SCHEMA_STORE_PATH", "schemas/schema_store.json"),
+    }
+
+
+def get_value_index_settings() -> dict:
+    load_env()
+    return {
+        # Dimensions with more distinct values than this are not indexed
+        "max_values": int(os.getenv("VALUE_INDEX_MAX_VALUES", "10000")),
+        # difflib similarity (0-1) needed to accept a fuzzy match
+        "fuzzy_cutoff": float(os.getenv("VALUE_INDEX_FUZZY_CUTOFF", "0.8")),
+    }
+
+
+def get_query_cache_settings() -> dict:
+    """
+    Per-connection query result cache. QUERY_CACHE_MAX_MB=0 disables it.
+    """
+    load_env()
+    return {
+        "max_bytes": int(float(os.getenv("QUERY_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    }
+
+
+def get_summary_settings() -> dict:
+    load_env()
+    dimensions = os.getenv("SUMMARY_DIMENSIONS", "")
+    return {
+        # Comma-separated dimension names; empty = the first `max_dimensions` of the schema
+        "dimensions": [d.strip() for d in dimensions.split(",") if d.strip()],
+        "max_dimensions": int(os.getenv("SUMMARY_MAX_DIMENSIONS", "3")),
+        # Groups kept per dimension, ranked by the primary metric
+        "top_n": int(os.getenv("SUMMARY_TOP_N", "3")),
+    }
+
+
+def get_rollup_settings() -> dict:
+    """
+    Pre-aggregated rollup tables built at load time. Off unless ROLLUPS_ENABLED=true.
+    """
+    load_env()
+    dimensions = os.getenv("ROLLUP_DIMENSIONS", "")
+    return {
+        "enabled": os.getenv("ROLLUPS_ENABLED", "false").strip().lower() in ["1", "true", "yes"],
+        # Comma-separated dimension names; empty = the first `max_dimensions` of the schema
+        "dimensions": [d.strip() for d in dimensions.split(",") if d.strip()],
+        "max_dimensions": int(os.getenv("ROLLUP_MAX_DIMENSIONS", "4")),
+        # Dimensions combined in one rollup (1 = single-dimension rollups only)
+        "max_group_dimensions": int(os.getenv("ROLLUP_MAX_GROUP_DIMENSIONS", "2")),
+        # Rollups with more rows than this are not kept
+        "max_rows": int(os.getenv("ROLLUP_MAX_ROWS", "1000000")),
+    }
+
+
+def get_typed_table_settings() -> dict:
+    """
+    Typed copy of the loaded table: metrics cast to DOUBLE once, low-cardinality
+    dimensions stored as ENUM. TYPED_TABLE=false keeps the table as loaded.
+    """
+    load_env()
+    return {
+        "enabled": os.getenv("TYPED_TABLE", "true").strip().lower() in ["1", "true", "yes"],
+        # Dimensions with at most this many distinct values become ENUM columns
+        # (up to 255 values are stored in one byte per row)
+        "max_enum_values": int(os.getenv("TYPED_TABLE_MAX_ENUM_VALUES", "255")),
+    }
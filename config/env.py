@@ -0,0 +1,13 @@
+_loaded = False
+
+
+def load_env():
+    """
+    Load `.env` once, on first use rather than at import time.
+    """
+    global _loaded
+
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
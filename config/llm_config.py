@@ -1,13 +1,77 @@
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
 
-load_dotenv()
+from config.env import load_env
 
-def get_openai_client():
+
+def get_llm_settings() -> dict:
+    load_env()
+    backend = os.getenv("LLM_BACKEND", "openai").strip().lower()
+
+    if backend not in ["openai", "offline"]:
+        raise ValueError(f"Unsupported LLM_BACKEND: {backend}")
+
+    return {
+        # "offline" answers from core.offline_llm without network access
+        "backend": backend,
+        "offline_latency": float(os.getenv("OFFLINE_LLM_LATENCY_MS", "0")) / 1000,
+        "timeout": float(os.getenv("LLM_TIMEOUT_SECONDS", "60")),
+        # The OpenAI SDK retries with exponential backoff and jitter
+        "max_retries": int(os.getenv("LLM_MAX_RETRIES", "3")),
+        "max_connections": int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+    }
+
+
+def get_llm_cache_settings() -> dict:
+    """
+    Response cache for temperature=0 calls. Set LLM_CACHE_PATH="" to disable.
+    """
+    load_env()
+    return {
+        "path": os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3"),
+        "memory_entries": int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256")),
+        "ttl_seconds": float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 86400))),
+        "max_entries": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    }
+
+
+def get_token_budget_settings() -> dict:
+    """
+    Token budgets (0 = unlimited). Exceeding one logs a warning, calls still go through.
+    """
+    load_env()
+    return {
+        # Input tokens of a single agent call
+        "prompt_budget": int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "8000")),
+        # Input + output tokens of the whole process
+        "session_budget": int(os.getenv("LLM_SESSION_TOKEN_BUDGET", "0")),
+    }
+
+
+def get_openai_client(http_client=None, timeout=None, max_retries=None):
+    from openai import OpenAI
+
+    return OpenAI(**client_options(http_client, timeout, max_retries))
+
+
+def get_async_openai_client(http_client=None, timeout=None, max_retries=None):
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(**client_options(http_client, timeout, max_retries))
+
+
+def client_options(http_client=None, timeout=None, max_retries=None) -> dict:
+    load_env()
     api_key = os.getenv("OPENAI_API_KEY")
 
     if not api_key:
         raise EnvironmentError("OPENAI_API_KEY not found in environment variables")
 
-    return OpenAI(api_key=api_key)
+    options = {"api_key": api_key}
+    if http_client is not None:
+        options["http_client"] = http_client
+    if timeout is not None:
+        options["timeout"] = timeout
+    if max_retries is not None:
+        options["max_retries"] = max_retries
+
+    return options
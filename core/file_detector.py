@@ -1,10 +1,22 @@
+import glob
 import os
 
 def detect_file_type(file_path: str) -> str:
+    file_path = str(file_path)
+
+    # Partitioned datasets: a directory or glob takes the type of its files
+    if os.path.isdir(file_path) or any(ch in file_path for ch in "*?["):
+        pattern = os.path.join(file_path, "**", "*") if os.path.isdir(file_path) else file_path
+        files = [f for f in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(f)]
+        if files:
+            file_path = files[0]
+
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext in [".csv"]:
         return "csv"
+    elif ext in [".parquet"]:
+        return "parquet"
     elif ext in [".xls", ".xlsx"]:
         return "excel"
     elif ext in [".json"]:
@@ -12,4 +24,4 @@ def detect_file_type(file_path: str) -> str:
     elif ext in [".txt"]:
         return "text"
     else:
-        raise ValueError("Unsupported file format")
\ No newline at end of file
+        raise ValueError("Unsupported file format")
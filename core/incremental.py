@@ -0,0 +1,242 @@
+import logging
+import os
+
+import duckdb
+
+from core.loader import load_source
+from core.rollups import append_to_rollups
+from core.profiler import compute_column_stats, merge_column_stats, numeric_columns_from_stats
+from core.semantic_schema import generate_semantic_schema
+from core.typed_table import (
+    DERIVED_TIME_COLUMNS,
+    clean_metrics,
+    date_expression,
+    derived_time_select,
+    widen_enum_columns,
+)
+from core.value_index import refresh_value_index
+from db.duckdb_conn import (
+    NATIVE_READERS,
+    DuckDBDataset,
+    get_connection_state,
+    invalidate_results,
+    native_source_sql,
+    quote_identifier,
+    unregister_frame,
+)
+
+STAGING_VIEW = "__append_rows"
+TYPED_VIEW = "__append_typed_rows"
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_base_table(con: duckdb.DuckDBPyConnection, table_name: str = "sales"):
+    """
+    Appends need a real table. A registered DataFrame or a view over files
+    is copied into a table once; every later append only inserts.
+    """
+    table_type = con.execute(
+        "SELECT table_type FROM information_schema.tables WHERE table_name = ?",
+        [table_name]
+    ).fetchone()
+
+    if table_type is None:
+        raise ValueError(f"Table not found: {table_name}")
+
+    if table_type[0] == "BASE TABLE":
+        return
+
+    staging = f"{table_name}__materialized"
+    con.execute(f"CREATE TABLE {quote_identifier(staging)} AS SELECT * FROM {quote_identifier(table_name)}")
+
+    unregister_frame(con, table_name)
+    con.execute(f"DROP VIEW IF EXISTS {quote_identifier(table_name)}")
+    con.execute(f"ALTER TABLE {quote_identifier(staging)} RENAME TO {quote_identifier(table_name)}")
+
+
+def stage_new_rows(con: duckdb.DuckDBPyConnection, file_path, file_type: str):
+    """
+    Expose the new file as a temporary view; CSV / Parquet paths are scanned
+    natively, anything else goes through the regular loader.
+    """
+    if file_type in NATIVE_READERS and isinstance(file_path, (str, os.PathLike)):
+        con.execute(
+            f"CREATE OR REPLACE TEMP VIEW {STAGING_VIEW} AS "
+            f"SELECT * FROM {native_source_sql(file_path, file_type)}"
+        )
+        return
+
+    data = load_source(file_path, file_type)
+
+    if isinstance(data, DuckDBDataset):
+        raise ValueError("Cannot append a dataset loaded on another DuckDB connection")
+
+    con.register(STAGING_VIEW, data)
+
+
+def append_data(
+    con: duckdb.DuckDBPyConnection,
+    file_path,
+    file_type: str,
+    profile: dict,
+    semantic_schema: dict,
+    table_name: str = "sales",
+    value_index=None
+):
+    """
+    Append a new data drop to the existing table and update the profile
+    incrementally. Only the new file is scanned; the semantic schema is
+    regenerated only when the set of columns changes.
+
+    New values are cast to the existing column types. Values that do not
+    parse are stored as NULL, counted per column and logged; the counts
+    are kept in the connection state (last_append_report).
+
+    Pass the filter `value_index` to add the new rows' dimension values to it.
+
+    Returns (profile, semantic_schema).
+    """
+    ensure_base_table(con, table_name)
+    stage_new_rows(con, file_path, file_type)
+
+    try:
+        table_types = {
+            row[0]: row[1]
+            for row in con.execute(f"DESCRIBE {quote_identifier(table_name)}").fetchall()
+        }
+        new_types = {
+            row[0]: row[1]
+            for row in con.execute(f"DESCRIBE {STAGING_VIEW}").fetchall()
+        }
+
+        # ---------- New columns ----------
+        added_columns = [col for col in new_types if col not in table_types]
+        for col in added_columns:
+            con.execute(
+                f"ALTER TABLE {quote_identifier(table_name)} "
+                f"ADD COLUMN {quote_identifier(col)} {new_types[col]}"
+            )
+            table_types[col] = new_types[col]
+
+        # ---------- Insert (cast to existing column types) ----------
+        table_types = widen_enum_columns(con, table_name, STAGING_VIEW, table_types)
+
+        # Text dates are parsed like the typed table parsed them at load
+        typed_date = (get_connection_state(con).get("typed_table") or {}).get("date")
+        date_column = typed_date["column"] if typed_date and typed_date["column"] in new_types else None
+
+        columns = list(new_types)
+        select_parts = []
+        dirty_checks = {}
+        date_sql = None
+        for col in columns:
+            quoted = quote_identifier(col)
+            cast_sql = f"TRY_CAST({quoted} AS {table_types[col]})"
+            if col == date_column:
+                if typed_date["format"] and str(new_types[col]).upper() == "VARCHAR":
+                    cast_sql = date_expression(quoted, typed_date["format"])
+                date_sql = cast_sql
+            select_parts.append(f"{cast_sql} AS {quoted}")
+            if str(new_types[col]) != str(table_types[col]) or col == date_column:
+                dirty_checks[col] = f"COUNT({quoted}) - COUNT({cast_sql})"
+
+        # Values the cast turns into NULL, counted like the typed table's dirty values
+        dirty_values = dict(zip(dirty_checks, con.execute(
+            f"SELECT {', '.join(dirty_checks.values())} FROM {STAGING_VIEW}"
+        ).fetchone())) if dirty_checks else {}
+        dirty_values = {col: int(count) for col, count in dirty_values.items() if count}
+
+        # The new rows as they are stored: profiled below, so values cast
+        # to NULL count as missing rather than as non-numeric text
+        con.execute(
+            f"CREATE OR REPLACE TEMP VIEW {TYPED_VIEW} AS "
+            f"SELECT {', '.join(select_parts)} FROM {STAGING_VIEW}"
+        )
+
+        # Derived year / quarter / month of the new rows
+        if date_sql:
+            columns += list(DERIVED_TIME_COLUMNS.values())
+            select_parts += derived_time_select(date_sql)
+
+        target_sql = ", ".join(quote_identifier(col) for col in columns)
+        select_sql = ", ".join(select_parts)
+        con.execute(
+            f"INSERT INTO {quote_identifier(table_name)} ({target_sql}) "
+            f"SELECT {select_sql} FROM {STAGING_VIEW}"
+        )
+        append_to_rollups(con, f"(SELECT {select_sql} FROM {STAGING_VIEW})")
+
+        if value_index is not None:
+            refresh_value_index(value_index, con, TYPED_VIEW)
+
+        # ---------- Profile (new rows only) ----------
+        new_stats = compute_column_stats(DuckDBDataset(con, TYPED_VIEW))
+        appended_rows = new_stats["row_count"]
+    finally:
+        # Cached query results no longer match the table
+        invalidate_results(con)
+        try:
+            con.unregister(STAGING_VIEW)
+        except duckdb.Error:
+            pass
+        con.execute(f"DROP VIEW IF EXISTS {TYPED_VIEW}")
+        con.execute(f"DROP VIEW IF EXISTS {STAGING_VIEW}")
+
+    if dirty_values:
+        logger.warning(
+            "Appended %d rows from %s; values stored as NULL because they do not parse: %s",
+            appended_rows, file_path, dirty_values
+        )
+    get_connection_state(con)["last_append"] = {
+        "rows": int(appended_rows),
+        "added_columns": added_columns,
+        "dirty_values": dirty_values,
+    }
+
+    column_stats = merge_column_stats(
+        profile.get("column_stats", {}),
+        profile.get("row_count", 0),
+        new_stats["columns"],
+        appended_rows
+    )
+    # Year / quarter / month the typed table derived from the date column
+    # stay time columns of the profile, so a regenerated schema keeps them
+    # and they are not sent to the LLM as data columns
+    time_columns = {**profile.get("time_columns", {}), **semantic_schema.get("time_columns", {})}
+    internal_columns = set(semantic_schema.get("time_columns", {}).values()) - set(profile.get("columns", []))
+
+    profile = {
+        **profile,
+        "columns": [col for col in table_types if col not in internal_columns],
+        "row_count": profile.get("row_count", 0) + appended_rows,
+        "numeric_metrics": [
+            col for col in numeric_columns_from_stats(column_stats)
+            if col not in set(time_columns.values())
+        ],
+        "column_stats": column_stats,
+        "time_columns": time_columns,
+    }
+    numeric_metrics = profile["numeric_metrics"]
+
+    if added_columns:
+        semantic_schema = generate_semantic_schema(profile)
+    else:
+        semantic_schema = {
+            **semantic_schema,
+            "metrics": [
+                m for m in semantic_schema.get("metrics", [])
+                if m in numeric_metrics
+            ]
+        }
+    semantic_schema["clean_metrics"] = clean_metrics(con, semantic_schema.get("metrics", []), table_name)
+
+    return profile, semantic_schema
+
+
+def last_append_report(con: duckdb.DuckDBPyConnection):
+    """
+    Rows, added columns and per-column dirty values of the last append_data
+    call on this connection, or None.
+    """
+    return get_connection_state(con).get("last_append")
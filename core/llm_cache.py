@@ -0,0 +1,134 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+
+
+class ResponseCache:
+    """
+    Two-tier cache for deterministic (temperature=0) chat completions:
+    an in-memory LRU in front of a persistent SQLite file.
+    """
+
+    def __init__(self, path, memory_entries: int = 256, ttl_seconds: float = 7 * 86400, max_entries: int = 10000):
+        self.path = Path(path)
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: list, temperature, backend: str = "openai") -> str:
+        """
+        The backend is part of the key, so offline stand-in answers are
+        never served to a run against the real API.
+        """
+        payload = json.dumps(
+            {"backend": backend, "model": model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and now - entry[1] <= self.ttl_seconds:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+            row = self.db.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self._remember(key, row[0], row[1])
+            self.disk_hits += 1
+            return row[0]
+
+    def put(self, key: str, content: str):
+        now = time.time()
+
+        with self.lock:
+            self._remember(key, content, now)
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, now, now)
+            )
+            self._evict(now)
+            self.db.commit()
+
+    def _remember(self, key: str, content: str, created_at: float):
+        self.memory[key] = (content, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        self.db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.db.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+
+def cached_response(content: str):
+    """
+    Minimal stand-in for a ChatCompletion: agents only read
+    response.choices[0].message.content.
+    """
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=None,
+        cached=True,
+    )
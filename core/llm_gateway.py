@@ -0,0 +1,255 @@
+import asyncio
+import atexit
+import threading
+import weakref
+
+from config.llm_config import (
+    get_async_openai_client,
+    get_llm_cache_settings,
+    get_llm_settings,
+    get_openai_client,
+)
+from core.llm_cache import ResponseCache, cached_response
+from core.token_ledger import get_token_ledger
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_fixed_async_client = None
+_session_loop = None
+_session_loop_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def create_llm_client():
+    """
+    One OpenAI client over a pooled HTTP connection, with timeouts and
+    retry / backoff configured from the environment. LLM_BACKEND=offline
+    swaps in the deterministic stand-in from core.offline_llm.
+    """
+    settings = get_llm_settings()
+    if settings["backend"] == "offline":
+        from core.offline_llm import OfflineLLMClient
+        return OfflineLLMClient(settings["offline_latency"])
+
+    import httpx
+
+    http_client = httpx.Client(
+        timeout=settings["timeout"],
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_connections"],
+        ),
+    )
+
+    return get_openai_client(
+        http_client=http_client,
+        timeout=settings["timeout"],
+        max_retries=settings["max_retries"],
+    )
+
+
+def get_llm_client():
+    """
+    Shared client, created on first use (not at import time).
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_llm_client()
+
+    return _client
+
+
+def create_async_llm_client():
+    settings = get_llm_settings()
+    if settings["backend"] == "offline":
+        from core.offline_llm import AsyncOfflineLLMClient
+        return AsyncOfflineLLMClient(settings["offline_latency"])
+
+    import httpx
+
+    http_client = httpx.AsyncClient(
+        timeout=settings["timeout"],
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_connections"],
+        ),
+    )
+
+    return get_async_openai_client(
+        http_client=http_client,
+        timeout=settings["timeout"],
+        max_retries=settings["max_retries"],
+    )
+
+
+def get_async_llm_client():
+    """
+    Async client for the running event loop. Pooled connections belong to
+    one loop, so each loop gets its own client; run coroutines through
+    run_async so a session keeps one loop, one client and one pool.
+    """
+    if _fixed_async_client is not None:
+        return _fixed_async_client
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None:
+        client = create_async_llm_client()
+        _async_clients[loop] = client
+
+    return client
+
+
+def get_session_loop() -> asyncio.AbstractEventLoop:
+    """
+    Process-wide event loop on a daemon thread, created on first use and
+    closed (with its async LLM client) at exit.
+    """
+    global _session_loop
+
+    if _session_loop is None:
+        with _session_loop_lock:
+            if _session_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-session-loop", daemon=True).start()
+                atexit.register(close_session_loop)
+                _session_loop = loop
+
+    return _session_loop
+
+
+def run_async(coro):
+    """
+    Run `coro` on the session loop and wait for its result. Unlike one
+    asyncio.run per question, the async client and its connection pool
+    are reused across calls. Must not be called from inside that loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_session_loop()).result()
+
+
+def close_session_loop():
+    global _session_loop
+
+    with _session_loop_lock:
+        loop, _session_loop = _session_loop, None
+
+    if loop is None:
+        return
+
+    client = _async_clients.pop(loop, None)
+    close = getattr(client, "close", None)
+    if close is not None:
+        asyncio.run_coroutine_threadsafe(close(), loop).result()
+
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def set_llm_client(client, async_client=None):
+    """
+    Replace the shared clients (e.g. with a stand-in for offline runs).
+    `async_client` is then used on every event loop.
+    """
+    global _client, _fixed_async_client
+    _client = client
+    _fixed_async_client = async_client
+    _async_clients.clear()
+
+
+def get_response_cache():
+    """
+    Shared response cache, or None when LLM_CACHE_PATH is empty.
+    """
+    global _cache
+
+    if _cache is None:
+        settings = get_llm_cache_settings()
+        if not settings["path"]:
+            return None
+
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    settings["path"],
+                    memory_entries=settings["memory_entries"],
+                    ttl_seconds=settings["ttl_seconds"],
+                    max_entries=settings["max_entries"],
+                )
+
+    return _cache
+
+
+def chat_completion(agent: str = None, **kwargs):
+    """
+    chat.completions.create, answered from the response cache when the
+    call is deterministic (temperature=0, not streamed). Token usage is
+    recorded in the ledger under `agent`.
+    """
+    if kwargs.get("stream"):
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        return metered_stream(get_llm_client().chat.completions.create(**kwargs), agent)
+
+    cache = None
+    if kwargs.get("temperature") == 0:
+        cache = get_response_cache()
+
+    if cache is None:
+        return metered(get_llm_client().chat.completions.create(**kwargs), agent)
+
+    key = ResponseCache.make_key(
+        kwargs.get("model"), kwargs.get("messages"), kwargs.get("temperature"), get_llm_settings()["backend"]
+    )
+    content = cache.get(key)
+    if content is not None:
+        return metered(cached_response(content), agent)
+
+    response = metered(get_llm_client().chat.completions.create(**kwargs), agent)
+    cache.put(key, response.choices[0].message.content)
+    return response
+
+
+async def achat_completion(agent: str = None, **kwargs):
+    """
+    Async counterpart of chat_completion, sharing the same response cache.
+    """
+    cache = None
+    if kwargs.get("temperature") == 0 and not kwargs.get("stream"):
+        cache = get_response_cache()
+
+    if cache is None:
+        return metered(await get_async_llm_client().chat.completions.create(**kwargs), agent)
+
+    key = ResponseCache.make_key(
+        kwargs.get("model"), kwargs.get("messages"), kwargs.get("temperature"), get_llm_settings()["backend"]
+    )
+    content = cache.get(key)
+    if content is not None:
+        return metered(cached_response(content), agent)
+
+    response = metered(await get_async_llm_client().chat.completions.create(**kwargs), agent)
+    cache.put(key, response.choices[0].message.content)
+    return response
+
+
+def metered(response, agent: str):
+    get_token_ledger().record(
+        agent, getattr(response, "usage", None), cached=getattr(response, "cached", False)
+    )
+    return response
+
+
+def metered_stream(stream, agent: str):
+    """
+    Pass chunks through; the final chunk carries usage (include_usage).
+    """
+    usage = None
+    for chunk in stream:
+        usage = getattr(chunk, "usage", None) or usage
+        yield chunk
+
+    get_token_ledger().record(agent, usage)
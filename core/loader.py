@@ -1,10 +1,50 @@
+import os
+import duckdb
 import pandas as pd
 import json
 
+from config.data_config import get_loader_engine
+from core.parquet_cache import get_parquet_cache
+from core.partitions import discover_partitions, is_multi_file_source
+from db.duckdb_conn import NATIVE_READERS, load_file_into_duckdb, load_partitioned_into_duckdb
+
+CACHEABLE_FILE_TYPES = ["csv", "excel"]
+
+
 def load_data(file_path: str, file_type: str):
+    # Glob or (hive-)partitioned directory -> one DuckDB view over all files
+    if is_multi_file_source(file_path):
+        file_type, files, partitions = discover_partitions(file_path)
+        return load_partitioned_into_duckdb(files, file_type, partitions)
+
+    # Parse CSV / Excel once, then reuse the Parquet copy on later loads
+    cache = get_parquet_cache()
+    if cache is not None and file_type in CACHEABLE_FILE_TYPES:
+        parquet_path = cache.get_or_convert(
+            file_path,
+            file_type,
+            lambda: load_source(file_path, file_type)
+        )
+        return load_source(parquet_path, "parquet")
+
+    return load_source(file_path, file_type)
+
+
+def load_source(file_path: str, file_type: str):
+    # Native DuckDB scan: only for paths on disk (uploads are file-like)
+    if (
+        file_type in NATIVE_READERS
+        and isinstance(file_path, (str, os.PathLike))
+        and get_loader_engine() == "duckdb"
+    ):
+        return load_file_into_duckdb(file_path, file_type)
+
     if file_type == "csv":
         return pd.read_csv(file_path,low_memory=False)
 
+    elif file_type == "parquet":
+        return duckdb.read_parquet(str(file_path)).df()
+
     elif file_type == "excel":
         return pd.read_excel(file_path)
 
@@ -12,4 +52,4 @@ def load_data(file_path: str, file_type: str):
         with open(file_path, "r") as f:
             return json.load(f)
     else:
-        raise ValueError("Unsupported file type")
\ No newline at end of file
+        raise ValueError("Unsupported file type")
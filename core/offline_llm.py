@@ -0,0 +1,165 @@
+"""
+Deterministic, network-free stand-in for the OpenAI chat-completions client.
+
+Answers are derived from the prompt itself (mode keywords, schema fields
+named in the question, profile column stats), so the whole pipeline can
+run offline with realistic shapes. `latency` seconds are added per call
+to model provider round-trips.
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from agents.intent_rule_parser import match_fields
+from agents.mode_detection_agent import detect_mode_rules
+from core.prompts import load_prompt
+
+TIME_TYPES = ("DATE", "TIMESTAMP", "TIME")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def prompt_kind(system_prompt: str):
+    for kind in ["mode_detection", "intent_extraction", "semantic_schema", "explanation"]:
+        if system_prompt.startswith(load_prompt(f"{kind}_prompt")):
+            return kind
+    return None
+
+
+def after_label(text: str, label: str) -> str:
+    return text.split(label, 1)[1].strip() if label in text else ""
+
+
+def answer_mode(user_content: str) -> str:
+    return detect_mode_rules(user_content) or "qa"
+
+
+def answer_intent(system_prompt: str, user_content: str) -> str:
+    schema = json.loads(after_label(system_prompt, "Semantic schema:") or "{}")
+    question = after_label(user_content, "User question:").lower()
+    metrics = schema.get("metrics", [])
+
+    metric_matches, rest = match_fields(question, metrics)
+    group_by, _ = match_fields(rest, schema.get("dimensions", []))
+
+    if "average" in question or "avg" in question:
+        aggregation = "avg"
+    elif "how many" in question or "count" in question:
+        aggregation = "count"
+    else:
+        aggregation = "sum"
+
+    if "qoq" in question or "quarter over quarter" in question:
+        comparison = "qoq"
+    elif "yoy" in question or "year over year" in question or "growth" in question:
+        comparison = "yoy"
+    else:
+        comparison = None
+
+    return json.dumps({
+        "metric": (metric_matches or metrics or [None])[0],
+        "aggregation": aggregation,
+        "group_by": group_by,
+        "filters": {},
+        "time_granularity": None,
+        "comparison": comparison,
+    })
+
+
+def answer_schema(user_content: str) -> str:
+    profile = json.loads(after_label(user_content, "Dataset profile:") or "{}")
+    column_stats = profile.get("column_stats", {})
+    metrics = profile.get("numeric_metrics", [])
+    time_fields = [
+        col for col, stats in column_stats.items()
+        if str(stats.get("type", "")).upper().startswith(TIME_TYPES)
+    ]
+    dimensions = [
+        col for col in profile.get("columns", [])
+        if col not in metrics and col not in time_fields
+    ]
+
+    return json.dumps({
+        "dataset_type": "transactional_sales" if time_fields else "aggregated_report",
+        "metrics": metrics,
+        "dimensions": dimensions,
+        "time_fields": time_fields,
+        "grain": "row level",
+    })
+
+
+def answer_explanation(user_content: str) -> str:
+    question = after_label(user_content.split("Analysis result:")[0], "User question:")
+    facts = after_label(user_content, "Analysis result:")
+    return f"Answer to \"{question}\": the analysis returned {facts}."
+
+
+class OfflineCompletions:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def answer(self, messages: list) -> str:
+        self.calls += 1
+        system_prompt = messages[0]["content"]
+        user_content = messages[-1]["content"]
+        kind = prompt_kind(system_prompt)
+
+        if kind == "mode_detection":
+            return answer_mode(user_content)
+        if kind == "intent_extraction":
+            return answer_intent(system_prompt, user_content)
+        if kind == "semantic_schema":
+            return answer_schema(user_content)
+        return answer_explanation(user_content)
+
+    def response(self, messages: list, content: str):
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=estimate_tokens(content),
+                prompt_tokens_details=None,
+            ),
+        )
+
+    def chunks(self, messages: list, content: str):
+        usage = self.response(messages, content).usage
+        for word in content.split(" "):
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))],
+                usage=None,
+            )
+        yield SimpleNamespace(choices=[], usage=usage)
+
+    def create(self, messages: list, stream: bool = False, **kwargs):
+        time.sleep(self.latency)
+        content = self.answer(messages)
+
+        if stream:
+            return self.chunks(messages, content)
+        return self.response(messages, content)
+
+
+class AsyncOfflineCompletions(OfflineCompletions):
+    async def create(self, messages: list, stream: bool = False, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self.response(messages, self.answer(messages))
+
+
+class OfflineLLMClient:
+    """
+    Exposes `.chat.completions.create` like openai.OpenAI.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=OfflineCompletions(latency))
+
+
+class AsyncOfflineLLMClient:
+    def __init__(self, latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=AsyncOfflineCompletions(latency))
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import duckdb
+
+from config.data_config import get_parquet_cache_settings
+from db.duckdb_conn import native_source_sql, open_duckdb_connection, quote_literal
+
+# Bump when the conversion itself changes so old Parquet files are not reused
+CACHE_FORMAT_VERSION = 1
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+INDEX_FILE = "index.json"
+
+
+class ParquetCache:
+    """
+    Converts source files (CSV / Excel) to Parquet once, keyed by a content
+    fingerprint. Entries are evicted least-recently-used above `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index = self._read_index()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- Fingerprinting ----------
+    def fingerprint(self, source, file_type: str) -> str:
+        """
+        sha256 of the file content. For paths on disk the digest is reused
+        while size and mtime are unchanged, so unchanged files are not re-read.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            key = str(Path(source).resolve())
+            stat = os.stat(source)
+            known = self.index["sources"].get(key)
+
+            if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+                return known["fingerprint"]
+
+            with open(source, "rb") as f:
+                digest = self._hash_stream(f, file_type)
+
+            # Source changed: its previous Parquet copy is stale
+            if known and known["fingerprint"] != digest:
+                self._drop_entry(known["fingerprint"])
+
+            self.index["sources"][key] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "fingerprint": digest,
+            }
+            self._write_index()
+            return digest
+
+        # File-like upload (e.g. Streamlit UploadedFile)
+        source.seek(0)
+        digest = self._hash_stream(source, file_type)
+        source.seek(0)
+        return digest
+
+    def _hash_stream(self, stream, file_type: str) -> str:
+        hasher = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}:{file_type}:".encode())
+        for chunk in iter(lambda: stream.read(HASH_CHUNK_BYTES), b""):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    # ---------- Lookup / conversion ----------
+    def get_or_convert(self, source, file_type: str, load_frame) -> Path:
+        """
+        Return the cached Parquet path for `source`, converting on a miss.
+        `load_frame()` parses the source into a DataFrame when DuckDB
+        cannot read it natively (Excel, uploads).
+        """
+        digest = self.fingerprint(source, file_type)
+        entry = self.index["entries"].get(digest)
+        parquet_path = self.cache_dir / f"{digest}.parquet"
+
+        if entry and parquet_path.exists():
+            self.hits += 1
+            entry["last_used"] = time.time()
+            self._write_index()
+            return parquet_path
+
+        self.misses += 1
+        self._convert(source, file_type, load_frame, parquet_path)
+
+        self.index["entries"][digest] = {
+            "size": parquet_path.stat().st_size,
+            "last_used": time.time(),
+        }
+        self._evict()
+        self._write_index()
+        return parquet_path
+
+    def _convert(self, source, file_type: str, load_frame, parquet_path: Path):
+        tmp_path = parquet_path.with_suffix(".parquet.tmp")
+        con = open_duckdb_connection()
+
+        try:
+            if file_type == "csv" and isinstance(source, (str, os.PathLike)):
+                # Stream CSV -> Parquet without a pandas copy
+                source_sql = native_source_sql(source, file_type)
+                try:
+                    con.execute(f"COPY (SELECT * FROM {source_sql}) TO {quote_literal(tmp_path)} (FORMAT parquet)")
+                except duckdb.Error:
+                    source_sql = native_source_sql(source, file_type, all_varchar=True)
+                    con.execute(f"COPY (SELECT * FROM {source_sql}) TO {quote_literal(tmp_path)} (FORMAT parquet)")
+            else:
+                df = load_frame()
+                con.register("source_df", df)
+                con.execute(f"COPY source_df TO {quote_literal(tmp_path)} (FORMAT parquet)")
+        finally:
+            con.close()
+
+        os.replace(tmp_path, parquet_path)
+
+    # ---------- Eviction / invalidation ----------
+    def _evict(self):
+        entries = self.index["entries"]
+        total = sum(e["size"] for e in entries.values())
+
+        for digest in sorted(entries, key=lambda d: entries[d]["last_used"]):
+            if total <= self.max_bytes or len(entries) == 1:
+                break
+            total -= entries[digest]["size"]
+            self._drop_entry(digest)
+
+    def _drop_entry(self, digest: str):
+        self.index["entries"].pop(digest, None)
+        (self.cache_dir / f"{digest}.parquet").unlink(missing_ok=True)
+
+    def invalidate(self, source=None):
+        """
+        Drop the cached copy of one source path, or everything when None.
+        """
+        if source is None:
+            for digest in list(self.index["entries"]):
+                self._drop_entry(digest)
+            self.index["sources"] = {}
+        else:
+            known = self.index["sources"].pop(str(Path(source).resolve()), None)
+            if known:
+                self._drop_entry(known["fingerprint"])
+
+        self._write_index()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.index["entries"]),
+            "bytes": sum(e["size"] for e in self.index["entries"].values()),
+        }
+
+    # ---------- Index persistence ----------
+    def _read_index(self) -> dict:
+        path = self.cache_dir / INDEX_FILE
+        try:
+            index = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+
+        index.setdefault("entries", {})
+        index.setdefault("sources", {})
+        return index
+
+    def _write_index(self):
+        path = self.cache_dir / INDEX_FILE
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self.index))
+        os.replace(tmp_path, path)
+
+
+_cache = None
+
+
+def get_parquet_cache():
+    """
+    Shared cache instance, or None when PARQUET_CACHE_DIR is not set.
+    """
+    global _cache
+
+    settings = get_parquet_cache_settings()
+    if not settings["cache_dir"]:
+        return None
+
+    if _cache is None or _cache.cache_dir != Path(settings["cache_dir"]):
+        _cache = ParquetCache(settings["cache_dir"], settings["max_bytes"])
+
+    return _cache
@@ -0,0 +1,136 @@
+import glob
+import os
+import re
+
+from core.file_detector import detect_file_type
+
+TIME_GRAINS = ["year", "quarter", "month"]
+
+MONTH_NAMES = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+MONTH_ABBREVIATIONS = {name[:3]: num for name, num in MONTH_NAMES.items()}
+
+GLOB_CHARS = ("*", "?", "[")
+HIVE_KEY_PATTERN = re.compile(r"^([A-Za-z_]+)=([^/\\]+)$")
+# "P  L March 2021.csv", "sales_mar-2021.csv"
+MONTH_YEAR_PATTERN = re.compile(r"([A-Za-z]{3,9})[\s_\-\.]*((?:19|20)\d{2})")
+# "sales_2021-03.csv", "2021_03.csv"
+YEAR_MONTH_PATTERN = re.compile(r"((?:19|20)\d{2})[\-_](\d{1,2})(?!\d)")
+
+
+def is_multi_file_source(path) -> bool:
+    """
+    True for glob patterns and directories (hive-style or flat).
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        return False
+
+    path = str(path)
+    if os.path.isdir(path):
+        return True
+
+    return (
+        not os.path.isfile(path)
+        and any(ch in path for ch in GLOB_CHARS)
+        and bool(glob.glob(path, recursive=True))
+    )
+
+
+def list_source_files(path) -> list:
+    path = str(path)
+
+    if os.path.isdir(path):
+        files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if not name.startswith(".")
+        ]
+    else:
+        files = glob.glob(path, recursive=True)
+
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+def parse_time_value(grain: str, value):
+    """
+    Convert a logical time value ("2023", "Q4", "March", 3) to an integer.
+    Returns None when the value cannot be interpreted.
+    """
+    text = str(value).strip().lower()
+
+    if grain == "quarter":
+        text = text.replace("q", "")
+    elif grain == "month" and not text.isdigit():
+        return MONTH_NAMES.get(text) or MONTH_ABBREVIATIONS.get(text[:3])
+
+    try:
+        number = int(float(text))
+    except ValueError:
+        return None
+
+    limits = {"year": (1900, 2100), "quarter": (1, 4), "month": (1, 12)}
+    low, high = limits.get(grain, (None, None))
+    if low is not None and not low <= number <= high:
+        return None
+
+    return number
+
+
+def extract_partition_values(file_path: str) -> dict:
+    """
+    Read year / quarter / month from hive keys (year=2021/month=3)
+    or, failing that, from the file name ("P  L March 2021.csv").
+    """
+    values = {}
+    hive_columns = {}
+    is_hive = False
+
+    for part in re.split(r"[/\\]", os.path.dirname(file_path)):
+        match = HIVE_KEY_PATTERN.match(part)
+        if not match:
+            continue
+
+        is_hive = True
+        grain = match.group(1).lower()
+        if grain in TIME_GRAINS:
+            parsed = parse_time_value(grain, match.group(2))
+            if parsed is not None:
+                values[grain] = parsed
+                hive_columns[grain] = match.group(1)
+
+    if is_hive:
+        return {"hive": True, "hive_columns": hive_columns, **values}
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+
+    for match in MONTH_YEAR_PATTERN.finditer(name):
+        month = parse_time_value("month", match.group(1))
+        if month is not None:
+            return {"year": int(match.group(2)), "month": month, "quarter": (month - 1) // 3 + 1}
+
+    match = YEAR_MONTH_PATTERN.search(name)
+    if match:
+        month = parse_time_value("month", match.group(2))
+        if month is not None:
+            return {"year": int(match.group(1)), "month": month, "quarter": (month - 1) // 3 + 1}
+
+    return {}
+
+
+def discover_partitions(path):
+    """
+    Resolve a glob / directory to (file_type, files, partition values per file).
+    """
+    files = list_source_files(path)
+    if not files:
+        raise ValueError(f"No files found for dataset path: {path}")
+
+    file_types = {detect_file_type(f) for f in files}
+    if len(file_types) != 1:
+        raise ValueError(f"Mixed file types in partitioned dataset: {sorted(file_types)}")
+
+    partitions = [extract_partition_values(f) for f in files]
+    return file_types.pop(), files, partitions
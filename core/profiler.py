@@ -1,4 +1,14 @@
-import pandas as pd
+from config.data_config import get_profiler_settings
+from db.duckdb_conn import DuckDBDataset, open_duckdb_connection, quote_identifier
+
+NUMERIC_DUCKDB_TYPES = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "BOOLEAN",
+}
+PROFILE_VIEW = "__profile_source"
+
+
 def profile_input(data):
     if isinstance(data, str):
         return {
@@ -13,22 +23,189 @@ def profile_input(data):
             "keys": list(data.keys())
         }
 
-    # Pandas DataFrame
-    return {
+    # DuckDB-native table (no pandas copy of the data)
+    if isinstance(data, DuckDBDataset):
+        time_columns = set(data.time_columns.values())
+        stats = compute_column_stats(data)
+        profile = {
+            "type": "tabular",
+            "columns": data.columns,
+            "row_count": stats["row_count"],
+            "sample_rows": get_sample_rows(data),
+            "numeric_metrics": [
+                col for col in numeric_columns_from_stats(stats["columns"])
+                if col not in time_columns
+            ],
+            "column_stats": stats["columns"],
+        }
+        if stats["sampled_rows"] is not None:
+            profile["sampled_rows"] = stats["sampled_rows"]
+        if data.time_columns:
+            profile["time_columns"] = data.time_columns
+        return profile
+
+    # Pandas DataFrame: profiled by DuckDB in place (no copy)
+    con = open_duckdb_connection()
+    try:
+        con.register(PROFILE_VIEW, data)
+        stats = compute_column_stats(DuckDBDataset(con, PROFILE_VIEW))
+    finally:
+        con.close()
+
+    profile = {
         "type": "tabular",
         "columns": list(data.columns),
         "row_count": len(data),
         "sample_rows": data.head(3).to_dict(orient="records"),
-        "numeric_metrics": get_numeric_columns(data)
+        "numeric_metrics": numeric_columns_from_stats(stats["columns"]),
+        "column_stats": stats["columns"],
+    }
+    if stats["sampled_rows"] is not None:
+        profile["sampled_rows"] = stats["sampled_rows"]
+    return profile
+
+
+def to_json_safe(value):
+    """Dates, decimals etc. from DuckDB are not JSON-serializable."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def get_sample_rows(dataset: DuckDBDataset, n: int = 3) -> list:
+    cursor = dataset.con.execute(f"SELECT * FROM {quote_identifier(dataset.table_name)} LIMIT {n}")
+    columns = [d[0] for d in cursor.description]
+
+    return [
+        {col: to_json_safe(val) for col, val in zip(columns, row)}
+        for row in cursor.fetchall()
+    ]
+
+
+def numeric_expr(quoted: str, col_type: str):
+    """
+    DOUBLE expression for a column, or None when it can never be numeric.
+    """
+    if col_type in NUMERIC_DUCKDB_TYPES or col_type.startswith("DECIMAL"):
+        return f"CAST({quoted} AS DOUBLE)"
+    if col_type == "VARCHAR":
+        return f"TRY_CAST({quoted} AS DOUBLE)"
+    return None
+
+
+def compute_column_stats(dataset: DuckDBDataset, sample_rows: int = None) -> dict:
+    """
+    Type, null rate, distinct count, min / max and numeric convertibility
+    for every column, in a single vectorized scan. Tables larger than
+    `sample_rows` are profiled on a bounded reservoir sample.
+    """
+    settings = get_profiler_settings()
+    if sample_rows is None:
+        sample_rows = settings["sample_rows"]
+
+    table = quote_identifier(dataset.table_name)
+    row_count = dataset.con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    source_sql = table
+    sampled_rows = None
+    if sample_rows and row_count > sample_rows:
+        source_sql = f"(SELECT * FROM {table} USING SAMPLE reservoir({int(sample_rows)} ROWS) REPEATABLE (42))"
+        sampled_rows = int(sample_rows)
+
+    column_types = dataset.describe()
+    aggregates = ["COUNT(*)"]
+
+    for col, col_type in column_types:
+        quoted = quote_identifier(col)
+        as_number = numeric_expr(quoted, col_type)
+        aggregates += [
+            f"COUNT({quoted})",
+            f"approx_count_distinct({quoted})",
+            f"MIN({quoted})",
+            f"MAX({quoted})",
+            f"COUNT({as_number})" if as_number else "0",
+            f"MIN({as_number})" if as_number else "NULL",
+            f"MAX({as_number})" if as_number else "NULL",
+        ]
+
+    row = dataset.con.execute(f"SELECT {', '.join(aggregates)} FROM {source_sql}").fetchone()
+    scanned_rows = row[0]
+    columns = {}
+
+    for i, (col, col_type) in enumerate(column_types):
+        non_null, distinct, min_raw, max_raw, numeric_count, min_num, max_num = row[1 + i * 7: 8 + i * 7]
+        numeric_ratio = numeric_count / non_null if non_null else 0.0
+        is_numeric = numeric_ratio >= settings["min_numeric_ratio"]
+
+        columns[col] = {
+            "type": col_type,
+            "null_rate": round(1 - non_null / scanned_rows, 4) if scanned_rows else 0.0,
+            "distinct_count": distinct,
+            "min": to_json_safe(min_num if is_numeric else min_raw),
+            "max": to_json_safe(max_num if is_numeric else max_raw),
+            "numeric_ratio": round(numeric_ratio, 4),
+        }
+
+    return {
+        "row_count": row_count,
+        "sampled_rows": sampled_rows,
+        "columns": columns,
     }
-def get_numeric_columns(df):
-    numeric_cols = []
 
-    for col in df.columns:
-        try:
-            pd.to_numeric(df[col].dropna().head(50))
-            numeric_cols.append(col)
-        except Exception:
-            pass
 
-    return numeric_cols
+def numeric_columns_from_stats(column_stats: dict) -> list:
+    """
+    A column is a numeric metric when (nearly) all of its non-null values
+    convert, not just the first few.
+    """
+    min_ratio = get_profiler_settings()["min_numeric_ratio"]
+    return [
+        col for col, stats in column_stats.items()
+        if stats["numeric_ratio"] >= min_ratio and stats["null_rate"] < 1.0
+    ]
+
+
+def merge_column_stats(old: dict, old_rows: int, new: dict, new_rows: int) -> dict:
+    """
+    Combine stats of existing rows with stats of newly appended rows.
+    Rates are row-weighted; distinct_count is a lower bound (max of both).
+    """
+    merged = {}
+    total_rows = old_rows + new_rows
+
+    for col in list(old) + [c for c in new if c not in old]:
+        a, b = old.get(col), new.get(col)
+        if a is None or b is None:
+            base = a or b
+            present_rows = old_rows if a else new_rows
+            null_rate = 1 - (1 - base["null_rate"]) * present_rows / total_rows if total_rows else 0.0
+            merged[col] = {**base, "null_rate": round(null_rate, 4)}
+            continue
+
+        a_non_null = (1 - a["null_rate"]) * old_rows
+        b_non_null = (1 - b["null_rate"]) * new_rows
+        non_null = a_non_null + b_non_null
+
+        merged[col] = {
+            "type": a["type"],
+            "null_rate": round(1 - non_null / total_rows, 4) if total_rows else 0.0,
+            "distinct_count": max(a["distinct_count"], b["distinct_count"]),
+            "min": pick_extreme(a["min"], b["min"], min),
+            "max": pick_extreme(a["max"], b["max"], max),
+            "numeric_ratio": round(
+                (a["numeric_ratio"] * a_non_null + b["numeric_ratio"] * b_non_null) / non_null, 4
+            ) if non_null else 0.0,
+        }
+
+    return merged
+
+
+def pick_extreme(a, b, choose):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    try:
+        return choose(a, b)
+    except TypeError:
+        return a
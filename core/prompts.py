@@ -0,0 +1,47 @@
+import functools
+import json
+from pathlib import Path
+
+PROMPT_DIR = Path("prompts")
+
+# Semantic schema keys the agents actually read
+SCHEMA_PROMPT_KEYS = ["dataset_type", "grain", "metrics", "dimensions", "time_fields", "time_columns"]
+
+
+@functools.lru_cache(maxsize=None)
+def load_prompt(name: str) -> str:
+    """
+    Prompt template, read from disk once per process.
+    """
+    return (PROMPT_DIR / f"{name}.txt").read_text()
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compact_schema(semantic_schema: dict) -> str:
+    """
+    Only the keys agents need, without indentation or empty values.
+    """
+    return compact_json({
+        key: semantic_schema[key]
+        for key in SCHEMA_PROMPT_KEYS
+        if semantic_schema.get(key) not in (None, [], {})
+    })
+
+
+def build_messages(prompt_name: str, user_content: str, context: str = None) -> list:
+    """
+    System message = template + per-dataset context, user message = the
+    per-call part. The system message stays byte-identical across
+    questions, so it forms a cacheable prefix on the provider side.
+    """
+    system_prompt = load_prompt(prompt_name)
+    if context:
+        system_prompt = f"{system_prompt}\n\n{context}"
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
@@ -0,0 +1,145 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from config.data_config import get_query_cache_settings
+from db.duckdb_conn import get_connection_state
+
+
+def canonical_sql(sql: str) -> str:
+    """
+    Whitespace-insensitive form, so the same query built with different
+    indentation shares an entry.
+    """
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def result_size(result) -> int:
+    """
+    Approximate bytes held by a DataFrame, a dict of NumPy arrays or an
+    Arrow table.
+    """
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+
+    if isinstance(result, dict):
+        size = 0
+        for array in result.values():
+            size += int(array.nbytes)
+            if array.dtype == object:
+                size += sum(sys.getsizeof(value) for value in array)
+        return size
+
+    return int(result.nbytes)
+
+
+def shared_result(result):
+    """
+    Form handed to callers: DataFrames are copied (callers may modify
+    them), NumPy arrays are shared read-only, Arrow tables are immutable.
+    """
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+
+    if isinstance(result, dict):
+        for array in result.values():
+            array.setflags(write=False)
+        return dict(result)
+
+    return result
+
+
+class QueryResultCache:
+    """
+    LRU of query results (DataFrames, NumPy columns or Arrow tables)
+    bounded by their memory footprint.
+    Lives in the connection state, so a reloaded dataset (new connection)
+    starts empty; appends and re-registrations clear it through
+    db.duckdb_conn.invalidate_results.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(sql: str, params=None, fetch: str = "df"):
+        return canonical_sql(sql), tuple(params or ()), fetch
+
+    def get(self, sql: str, params=None, fetch: str = "df"):
+        key = self.make_key(sql, params, fetch)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return shared_result(entry[0])
+
+    def put(self, sql: str, result, params=None, fetch: str = "df"):
+        size = result_size(result)
+        if size > self.max_bytes:
+            return
+
+        key = self.make_key(sql, params, fetch)
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+
+            self.entries[key] = (shared_result(result), size)
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "invalidations": self.invalidations,
+        }
+
+
+def get_result_cache(con):
+    """
+    Result cache of a connection, or None when QUERY_CACHE_MAX_MB=0.
+    """
+    state = get_connection_state(con)
+    cache = state.get("result_cache")
+
+    if cache is None:
+        max_bytes = get_query_cache_settings()["max_bytes"]
+        if max_bytes <= 0:
+            return None
+
+        with state["lock"]:
+            cache = state.get("result_cache")
+            if cache is None:
+                cache = QueryResultCache(max_bytes)
+                state["result_cache"] = cache
+
+    return cache
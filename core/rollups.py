@@ -0,0 +1,297 @@
+import itertools
+
+import duckdb
+
+from agents.data_extraction_agent import safe_numeric_expr
+from config.data_config import get_rollup_settings
+from core.typed_table import DATE_TYPES, DERIVED_TIME_COLUMNS
+from db.duckdb_conn import DuckDBDataset, get_connection_state, quote_identifier
+
+CUBE_TABLE = "__rollup_cube"
+ROLLUP_PREFIX = "__rollup_"
+GROUPING_COLUMN = "__grouping_id"
+
+# Time levels stored in a rollup for each grain (coarser levels included),
+# under the typed table's derived column names
+TIME_LEVELS = {
+    None: [],
+    "year": ["year"],
+    "quarter": ["year", "quarter"],
+    "month": ["year", "quarter", "month"],
+}
+
+
+def metric_columns(metric: str) -> dict:
+    """
+    Additive parts of every supported aggregation: sum and count of the
+    numeric values (sum, avg) and count of raw non-null values (count).
+    """
+    return {
+        "sum": f"__sum__{metric}",
+        "numeric_count": f"__num__{metric}",
+        "count": f"__cnt__{metric}",
+    }
+
+
+def rollup_dimensions(semantic_schema: dict) -> list:
+    settings = get_rollup_settings()
+    dimensions = semantic_schema.get("dimensions", [])
+
+    if settings["dimensions"]:
+        return [d for d in settings["dimensions"] if d in dimensions]
+
+    return dimensions[:settings["max_dimensions"]]
+
+
+def time_expressions(con, semantic_schema: dict, table_name: str) -> dict:
+    """
+    SQL for year / quarter / month: partition columns when the loader
+    provided them, else extracted from the date column the base query
+    uses (first time field), when it is a DATE / TIMESTAMP.
+    """
+    time_columns = semantic_schema.get("time_columns") or {}
+    time_fields = semantic_schema.get("time_fields") or []
+    column_types = dict(DuckDBDataset(con, table_name).describe())
+    date_column = None
+    if time_fields and str(column_types.get(time_fields[0], "")).upper().startswith(DATE_TYPES):
+        date_column = quote_identifier(time_fields[0])
+
+    expressions = {}
+    for level in ["year", "quarter", "month"]:
+        if level in time_columns:
+            expressions[level] = quote_identifier(time_columns[level])
+        elif level == "quarter" and "month" in time_columns:
+            expressions[level] = f"(({quote_identifier(time_columns['month'])} - 1) // 3 + 1)"
+        elif date_column:
+            expressions[level] = f"EXTRACT({level.upper()} FROM {date_column})"
+
+    # A grain is usable only with all of its coarser levels
+    if "year" not in expressions:
+        return {}
+    return expressions
+
+
+def rollup_sets(dimensions: list, time_exprs: dict, max_group_dimensions: int) -> list:
+    """
+    (dimensions, time grain) pairs to materialize.
+    """
+    grains = [grain for grain, levels in TIME_LEVELS.items() if all(l in time_exprs for l in levels)]
+    sets = []
+
+    for size in range(max_group_dimensions + 1):
+        for dims in itertools.combinations(dimensions, size):
+            for grain in grains:
+                sets.append((list(dims), grain))
+
+    return sets
+
+
+def grouping_mask(columns: list, grouped: list) -> int:
+    """
+    Value of GROUPING(columns...) for a set: a bit is 1 for each
+    column that is not grouped, first column = most significant bit.
+    """
+    n = len(columns)
+    return sum(1 << (n - 1 - i) for i, col in enumerate(columns) if col not in grouped)
+
+
+def cube_sql(source: str, metrics: list, dimensions: list, time_exprs: dict, sets: list, clean_metrics=()) -> str:
+    """
+    Every rollup set from a single scan of `source`.
+    """
+    time_aliases = [DERIVED_TIME_COLUMNS[level] for level in time_exprs]
+    key_columns = [quote_identifier(d) for d in dimensions] + time_aliases
+
+    projection = ", ".join(
+        [quote_identifier(d) for d in dimensions]
+        + [f"{expr} AS {DERIVED_TIME_COLUMNS[level]}" for level, expr in time_exprs.items()]
+        + [quote_identifier(m) for m in metrics]
+    )
+
+    aggregates = []
+    for metric in metrics:
+        quoted = quote_identifier(metric)
+        numeric = safe_numeric_expr(quoted, metric in clean_metrics)
+        parts = metric_columns(metric)
+        aggregates += [
+            f"SUM({numeric}) AS {quote_identifier(parts['sum'])}",
+            f"COUNT({numeric}) AS {quote_identifier(parts['numeric_count'])}",
+            f"COUNT({quoted}) AS {quote_identifier(parts['count'])}",
+        ]
+
+    grouping_sets = ", ".join(
+        "(" + ", ".join(
+            [quote_identifier(d) for d in dims] + [DERIVED_TIME_COLUMNS[l] for l in TIME_LEVELS[grain]]
+        ) + ")"
+        for dims, grain in sets
+    )
+
+    return f"""
+    SELECT GROUPING({', '.join(key_columns)}) AS {GROUPING_COLUMN},
+           {', '.join(key_columns)}, {', '.join(aggregates)}
+    FROM (SELECT {projection} FROM {source})
+    GROUP BY GROUPING SETS ({grouping_sets})
+    """
+
+
+def set_columns(dims: list, grain, metrics: list) -> list:
+    return (
+        [quote_identifier(d) for d in dims]
+        + [DERIVED_TIME_COLUMNS[l] for l in TIME_LEVELS[grain]]
+        + [quote_identifier(c) for m in metrics for c in metric_columns(m).values()]
+    )
+
+
+def build_rollups(con: duckdb.DuckDBPyConnection, semantic_schema: dict, table_name: str = "sales") -> list:
+    """
+    Materialize rollups of the schema's metrics by up to
+    ROLLUP_MAX_GROUP_DIMENSIONS dimensions and each available time grain,
+    and register them on the connection for the query router. Rollups
+    larger than ROLLUP_MAX_ROWS are dropped. Returns the registered rollups.
+    """
+    settings = get_rollup_settings()
+    metrics = semantic_schema.get("metrics", [])
+    clean_metrics = semantic_schema.get("clean_metrics", [])
+    dimensions = rollup_dimensions(semantic_schema)
+    drop_rollups(con)
+
+    if not metrics:
+        return []
+
+    time_exprs = time_expressions(con, semantic_schema, table_name)
+    sets = rollup_sets(dimensions, time_exprs, settings["max_group_dimensions"])
+    key_columns = dimensions + [DERIVED_TIME_COLUMNS[level] for level in time_exprs]
+    source = quote_identifier(table_name)
+
+    con.execute(f"CREATE OR REPLACE TEMP TABLE {CUBE_TABLE} AS {cube_sql(source, metrics, dimensions, time_exprs, sets, clean_metrics)}")
+
+    rollups = []
+    try:
+        for i, (dims, grain) in enumerate(sets):
+            grouped = dims + [DERIVED_TIME_COLUMNS[l] for l in TIME_LEVELS[grain]]
+            mask = grouping_mask(key_columns, grouped)
+            rows = con.execute(
+                f"SELECT COUNT(*) FROM {CUBE_TABLE} WHERE {GROUPING_COLUMN} = ?", [mask]
+            ).fetchone()[0]
+
+            if rows > settings["max_rows"]:
+                continue
+
+            name = f"{ROLLUP_PREFIX}{i}"
+            con.execute(
+                f"CREATE OR REPLACE TABLE {quote_identifier(name)} AS "
+                f"SELECT {', '.join(set_columns(dims, grain, metrics))} FROM {CUBE_TABLE} "
+                f"WHERE {GROUPING_COLUMN} = ?",
+                [mask]
+            )
+            rollups.append({
+                "table": name,
+                "dimensions": dims,
+                "time_levels": TIME_LEVELS[grain],
+                "mask": mask,
+                "rows": rows,
+            })
+    finally:
+        con.execute(f"DROP TABLE IF EXISTS {CUBE_TABLE}")
+
+    get_connection_state(con)["rollups"] = {
+        "metrics": metrics,
+        "clean_metrics": clean_metrics,
+        "dimensions": dimensions,
+        "time_exprs": time_exprs,
+        "tables": rollups,
+        "hits": 0,
+        "misses": 0,
+    }
+    return rollups
+
+
+def append_to_rollups(con: duckdb.DuckDBPyConnection, source: str):
+    """
+    Add the aggregates of newly appended rows (`source`: a quoted relation
+    or a parenthesised SELECT, typed like the table) to every rollup.
+    Rollup rows are re-aggregated at query time, so a group may appear
+    more than once. Dimension columns follow the source's types (ENUMs
+    widened for new values). Rollups that cannot be updated are dropped,
+    so queries fall back to the base table instead of stale totals.
+    """
+    registry = get_rollups(con)
+    if not registry or not registry["tables"]:
+        return
+
+    try:
+        align_dimension_types(con, registry, source)
+        insert_rollup_rows(con, registry, source)
+    except duckdb.Error:
+        drop_rollups(con)
+
+
+def align_dimension_types(con: duckdb.DuckDBPyConnection, registry: dict, source: str):
+    """
+    Give rollup dimension columns the source's type, e.g. an ENUM that
+    widen_enum_columns re-created with an appended value.
+    """
+    source_types = {
+        row[0]: row[1]
+        for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+    }
+
+    for rollup in registry["tables"]:
+        rollup_types = dict(DuckDBDataset(con, rollup["table"]).describe())
+        for dim in rollup["dimensions"]:
+            if dim in source_types and rollup_types.get(dim) != source_types[dim]:
+                con.execute(
+                    f"ALTER TABLE {quote_identifier(rollup['table'])} "
+                    f"ALTER COLUMN {quote_identifier(dim)} TYPE {source_types[dim]}"
+                )
+
+
+def insert_rollup_rows(con: duckdb.DuckDBPyConnection, registry: dict, source: str):
+    metrics = registry["metrics"]
+    dimensions = registry["dimensions"]
+    time_exprs = registry["time_exprs"]
+    sets = [(r["dimensions"], grain_of(r["time_levels"])) for r in registry["tables"]]
+
+    con.execute(
+        f"CREATE OR REPLACE TEMP TABLE {CUBE_TABLE} AS "
+        f"{cube_sql(source, metrics, dimensions, time_exprs, sets, registry['clean_metrics'])}"
+    )
+    try:
+        for rollup, (dims, grain) in zip(registry["tables"], sets):
+            con.execute(
+                f"INSERT INTO {quote_identifier(rollup['table'])} "
+                f"SELECT {', '.join(set_columns(dims, grain, metrics))} FROM {CUBE_TABLE} "
+                f"WHERE {GROUPING_COLUMN} = ?",
+                [rollup["mask"]]
+            )
+            rollup["rows"] = con.execute(
+                f"SELECT COUNT(*) FROM {quote_identifier(rollup['table'])}"
+            ).fetchone()[0]
+    finally:
+        con.execute(f"DROP TABLE IF EXISTS {CUBE_TABLE}")
+
+
+def grain_of(time_levels: list):
+    return time_levels[-1] if time_levels else None
+
+
+def get_rollups(con: duckdb.DuckDBPyConnection):
+    return get_connection_state(con).get("rollups")
+
+
+def drop_rollups(con: duckdb.DuckDBPyConnection):
+    registry = get_connection_state(con).pop("rollups", None)
+    for rollup in (registry or {}).get("tables", []):
+        con.execute(f"DROP TABLE IF EXISTS {quote_identifier(rollup['table'])}")
+
+
+def rollup_stats(con: duckdb.DuckDBPyConnection) -> dict:
+    registry = get_rollups(con) or {"tables": [], "hits": 0, "misses": 0}
+    lookups = registry["hits"] + registry["misses"]
+    return {
+        "rollups": len(registry["tables"]),
+        "rows": sum(r["rows"] for r in registry["tables"]),
+        "hits": registry["hits"],
+        "misses": registry["misses"],
+        "hit_rate": registry["hits"] / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,112 @@
+import copy
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+
+from config.data_config import get_schema_store_settings
+from config.llm_config import get_llm_settings
+
+
+class SchemaStore:
+    """
+    Persistent semantic schemas keyed by the shape of a dataset profile,
+    so a dataset we have already seen skips the schema LLM call.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = self._read()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, profile: dict, prompt: str = "") -> str:
+        """
+        Column names, types and coarse statistics. Row counts and exact
+        values are left out so appending rows keeps the same fingerprint.
+        The prompt text is included so prompt edits invalidate old entries,
+        and the LLM backend so offline schemas are kept apart from real ones.
+        """
+        column_stats = profile.get("column_stats", {})
+        shape = {
+            "columns": [
+                {
+                    "name": col,
+                    "type": column_stats.get(col, {}).get("type"),
+                    "null_rate": round(column_stats.get(col, {}).get("null_rate", 0.0), 1),
+                    # order of magnitude only: 10s, 100s, 1000s of values
+                    "distinct": int(math.log10(column_stats.get(col, {}).get("distinct_count", 0) + 1)),
+                }
+                for col in profile.get("columns", [])
+            ],
+            "numeric_metrics": sorted(profile.get("numeric_metrics", [])),
+            "time_columns": profile.get("time_columns", {}),
+            "prompt": hashlib.sha256(prompt.encode()).hexdigest(),
+            "backend": get_llm_settings()["backend"],
+        }
+        return hashlib.sha256(json.dumps(shape, sort_keys=True).encode()).hexdigest()
+
+    def get(self, profile: dict, prompt: str = ""):
+        entry = self.entries.get(self.fingerprint(profile, prompt))
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return copy.deepcopy(entry)
+
+    def put(self, profile: dict, schema: dict, prompt: str = ""):
+        self.entries[self.fingerprint(profile, prompt)] = copy.deepcopy(schema)
+        self._write()
+
+    def invalidate(self, profile: dict = None, prompt: str = ""):
+        """
+        Forget the schema for one profile, or every stored schema when None.
+        """
+        if profile is None:
+            self.entries = {}
+        else:
+            self.entries.pop(self.fingerprint(profile, prompt), None)
+        self._write()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+        }
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2))
+        os.replace(tmp_path, self.path)
+
+
+_store = None
+
+
+def get_schema_store():
+    """
+    Shared store, or None when SCHEMA_STORE_PATH is set to an empty value.
+    """
+    global _store
+
+    path = get_schema_store_settings()["path"]
+    if not path:
+        return None
+
+    if _store is None or _store.path != Path(path):
+        _store = SchemaStore(path)
+
+    return _store
@@ -1,26 +1,26 @@
 import json
-from pathlib import Path
-from config.llm_config import get_openai_client
+from core.llm_gateway import chat_completion
+from core.prompts import build_messages, compact_json, load_prompt
+from core.schema_store import get_schema_store
 
-client = get_openai_client()
-PROMPT_PATH = Path("prompts/semantic_schema_prompt.txt")
+PROMPT_NAME = "semantic_schema_prompt"
 
 
 def generate_semantic_schema(profile: dict):
-    system_prompt = PROMPT_PATH.read_text()
+    system_prompt = load_prompt(PROMPT_NAME)
 
-    user_input = f"""
-    Dataset profile:
-    {json.dumps(profile, indent=2)}
-    """
+    # Known dataset shape: skip the LLM round-trip
+    store = get_schema_store()
+    if store is not None:
+        cached = store.get(profile, system_prompt)
+        if cached is not None:
+            return cached
 
-    response = client.chat.completions.create(
+    response = chat_completion(
         model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_input}
-        ],
-        temperature=0
+        messages=build_messages(PROMPT_NAME, f"Dataset profile:\n{compact_json(profile)}"),
+        temperature=0,
+        agent="semantic_schema"
     )
 
     raw_output = response.choices[0].message.content.strip()
@@ -50,4 +50,15 @@ def generate_semantic_schema(profile: dict):
 
     parsed["metrics"] = filtered_metrics
 
+    # Partition columns (year / quarter / month) come from the loader, not the LLM,
+    # and are filtered through time filters rather than as dimensions
+    parsed["time_columns"] = profile.get("time_columns", {})
+    parsed["dimensions"] = [
+        d for d in parsed.get("dimensions", [])
+        if d not in parsed["time_columns"].values()
+    ]
+
+    if store is not None:
+        store.put(profile, parsed, system_prompt)
+
     return parsed
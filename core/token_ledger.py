@@ -0,0 +1,87 @@
+import logging
+import threading
+
+from config.llm_config import get_token_budget_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenLedger:
+    """
+    Input / output tokens per agent, from the `usage` of each response,
+    checked against a per-call prompt budget and a session budget.
+    """
+
+    def __init__(self, prompt_budget: int = 0, session_budget: int = 0):
+        self.prompt_budget = prompt_budget
+        self.session_budget = session_budget
+        self.agents = {}
+        self.lock = threading.Lock()
+
+    def record(self, agent: str, usage, cached: bool = False):
+        agent = agent or "unknown"
+
+        with self.lock:
+            entry = self.agents.setdefault(agent, {
+                "calls": 0,
+                "cache_hits": 0,
+                "prompt_tokens": 0,
+                "cached_prompt_tokens": 0,
+                "completion_tokens": 0,
+                "over_budget_calls": 0,
+            })
+            entry["calls"] += 1
+
+            # Answered by the local response cache: no tokens spent
+            if cached:
+                entry["cache_hits"] += 1
+                return
+            if usage is None:
+                return
+
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["cached_prompt_tokens"] += getattr(details, "cached_tokens", 0) or 0
+            entry["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+            if self.prompt_budget and prompt_tokens > self.prompt_budget:
+                entry["over_budget_calls"] += 1
+                logger.warning(
+                    "%s prompt used %d tokens (budget %d)",
+                    agent, prompt_tokens, self.prompt_budget
+                )
+
+            total = self._total_tokens()
+
+        if self.session_budget and total > self.session_budget:
+            logger.warning("LLM session used %d tokens (budget %d)", total, self.session_budget)
+
+    def _total_tokens(self) -> int:
+        return sum(e["prompt_tokens"] + e["completion_tokens"] for e in self.agents.values())
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "agents": {agent: dict(entry) for agent, entry in self.agents.items()},
+                "total_tokens": self._total_tokens(),
+                "prompt_budget": self.prompt_budget,
+                "session_budget": self.session_budget,
+            }
+
+    def reset(self):
+        with self.lock:
+            self.agents.clear()
+
+
+_ledger = None
+
+
+def get_token_ledger() -> TokenLedger:
+    global _ledger
+
+    if _ledger is None:
+        settings = get_token_budget_settings()
+        _ledger = TokenLedger(settings["prompt_budget"], settings["session_budget"])
+
+    return _ledger
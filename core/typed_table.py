@@ -0,0 +1,276 @@
+import duckdb
+
+from config.data_config import get_typed_table_settings
+from db.duckdb_conn import (
+    DuckDBDataset,
+    get_connection_state,
+    invalidate_results,
+    quote_identifier,
+    quote_literal,
+    reset_thread_cursors,
+    unregister_frame,
+)
+
+NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "REAL", "DOUBLE", "DECIMAL",
+)
+DATE_TYPES = ("DATE", "TIMESTAMP")
+# Text date layouts tried after ISO dates / timestamps, in order
+DATE_FORMATS = ["%m-%d-%y", "%m/%d/%Y", "%m/%d/%y", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y"]
+
+# Year / quarter / month derived from the date column at load
+DERIVED_TIME_COLUMNS = {"year": "__year", "quarter": "__quarter", "month": "__month"}
+DERIVED_TIME_TYPES = {"year": "SMALLINT", "quarter": "TINYINT", "month": "TINYINT"}
+
+
+def is_numeric_type(column_type) -> bool:
+    return str(column_type).upper().startswith(NUMERIC_TYPES)
+
+
+def clean_metrics(con: duckdb.DuckDBPyConnection, metrics: list, table_name: str = "sales") -> list:
+    """
+    Metrics stored with a numeric type: queries aggregate them directly
+    instead of TRY_CASTing every value.
+    """
+    column_types = dict(DuckDBDataset(con, table_name).describe())
+    return [m for m in metrics if is_numeric_type(column_types.get(m))]
+
+
+def enum_type(values: list) -> str:
+    return "ENUM(" + ", ".join(quote_literal(v) for v in values) + ")"
+
+
+def date_expression(quoted: str, date_format: str) -> str:
+    """
+    SQL parsing a text date column: "DATE" / "TIMESTAMP" for ISO values,
+    else a strptime format.
+    """
+    if date_format in DATE_TYPES:
+        return f"TRY_CAST({quoted} AS {date_format})"
+    return f"CAST(try_strptime({quoted}, {quote_literal(date_format)}) AS DATE)"
+
+
+def detect_date_format(con: duckdb.DuckDBPyConnection, table_name: str, column: str, sample_rows: int = 10000):
+    """
+    First layout that parses every sampled value of a text date column
+    (ISO values with a time of day stay TIMESTAMP), or None.
+    Trying layouts on a sample keeps failed parses off the full table.
+    """
+    quoted = quote_identifier(column)
+    sample = (
+        f"(SELECT {quoted} FROM {quote_identifier(table_name)} "
+        f"WHERE {quoted} IS NOT NULL LIMIT {int(sample_rows)})"
+    )
+
+    for date_format in ["DATE", "TIMESTAMP"] + DATE_FORMATS:
+        condition = f"{date_expression(quoted, date_format)} IS NULL"
+        if date_format == "DATE":
+            condition += f" OR TRY_CAST({quoted} AS TIMESTAMP) <> TRY_CAST({quoted} AS DATE)"
+
+        sampled, failed = con.execute(
+            f"SELECT COUNT(*), COUNT(*) FILTER (WHERE {condition}) FROM {sample}"
+        ).fetchone()
+        if not sampled:
+            return None
+        if not failed:
+            return date_format
+
+    return None
+
+
+def derived_time_select(date_sql: str) -> list:
+    return [
+        f"CAST(EXTRACT({level.upper()} FROM {date_sql}) AS {DERIVED_TIME_TYPES[level]}) AS {quote_identifier(col)}"
+        for level, col in DERIVED_TIME_COLUMNS.items()
+    ]
+
+
+def build_typed_table(con: duckdb.DuckDBPyConnection, semantic_schema: dict, table_name: str = "sales") -> dict:
+    """
+    Replace the loaded table with a typed copy, once: text metrics are cast
+    to DOUBLE (values that do not parse become NULL and are counted as
+    dirty), text dimensions with few distinct values become ENUMs and the
+    date column (first time field) is parsed to DATE / TIMESTAMP, with
+    year / quarter / month columns added and rows stored in date order.
+    Views over files (DUCKDB_MATERIALIZE=view, partitioned sources) are
+    left as they are, so their files are still scanned lazily.
+
+    Records `clean_metrics` (and `time_columns` for the derived date
+    parts) on the schema and returns a report.
+    """
+    settings = get_typed_table_settings()
+    metrics = semantic_schema.get("metrics", [])
+    report = {"typed": False, "metrics": {}, "enum_dimensions": []}
+
+    if settings["enabled"] and (
+        table_name in get_connection_state(con)["frames"]
+        or table_kind(con, table_name) == "BASE TABLE"
+    ):
+        report = materialize_typed_table(con, semantic_schema, table_name, settings["max_enum_values"])
+
+    semantic_schema["clean_metrics"] = clean_metrics(con, metrics, table_name)
+    return report
+
+
+def table_kind(con: duckdb.DuckDBPyConnection, table_name: str):
+    row = con.execute(
+        "SELECT table_type FROM information_schema.tables WHERE table_name = ?",
+        [table_name]
+    ).fetchone()
+    return row[0] if row else None
+
+
+def materialize_typed_table(con: duckdb.DuckDBPyConnection, semantic_schema: dict, table_name: str, max_enum_values: int) -> dict:
+    column_types = DuckDBDataset(con, table_name).describe()
+    time_fields = semantic_schema.get("time_fields") or []
+    text_metrics = [
+        col for col, col_type in column_types
+        if col in semantic_schema.get("metrics", []) and not is_numeric_type(col_type)
+    ]
+    text_dimensions = [
+        col for col, col_type in column_types
+        if col in semantic_schema.get("dimensions", [])
+        and col not in time_fields
+        and str(col_type).upper() == "VARCHAR"
+    ]
+
+    # The date column queries filter on (first time field); partitioned
+    # sources already carry year / quarter / month columns
+    types = dict(column_types)
+    date_column = (
+        time_fields[0]
+        if time_fields and time_fields[0] in types and not semantic_schema.get("time_columns")
+        else None
+    )
+    date_format = None
+    if date_column and not str(types[date_column]).upper().startswith(DATE_TYPES):
+        date_format = detect_date_format(con, table_name, date_column)
+        if date_format is None:
+            date_column = None
+
+    # ---------- One scan: dirty values, cardinalities, unparsed dates ----------
+    checks = {}
+    for m in text_metrics:
+        checks[("dirty", m)] = f"COUNT({quote_identifier(m)}) - COUNT(TRY_CAST({quote_identifier(m)} AS DOUBLE))"
+    for d in text_dimensions:
+        checks[("distinct", d)] = f"COUNT(DISTINCT {quote_identifier(d)})"
+    if date_format:
+        quoted_date = quote_identifier(date_column)
+        checks[("unparsed", date_column)] = (
+            f"COUNT({quoted_date}) - COUNT({date_expression(quoted_date, date_format)})"
+        )
+
+    counts = (
+        dict(zip(checks, con.execute(
+            f"SELECT {', '.join(checks.values())} FROM {quote_identifier(table_name)}"
+        ).fetchone()))
+        if checks else {}
+    )
+    dirty = {m: counts[("dirty", m)] for m in text_metrics}
+
+    enum_types = {}
+    for dim in text_dimensions:
+        if 0 < counts[("distinct", dim)] <= max_enum_values:
+            values = con.execute(
+                f"SELECT DISTINCT {quote_identifier(dim)} FROM {quote_identifier(table_name)} "
+                f"WHERE {quote_identifier(dim)} IS NOT NULL ORDER BY 1"
+            ).fetchall()
+            enum_types[dim] = enum_type([row[0] for row in values])
+
+    # The sample matched but some values further down do not parse
+    if date_format and counts[("unparsed", date_column)]:
+        date_column = date_format = None
+
+    # ---------- Typed copy, sorted by date ----------
+    select_sql = []
+    date_sql = None
+    for col, _ in column_types:
+        quoted = quote_identifier(col)
+        if col == date_column:
+            date_sql = date_expression(quoted, date_format) if date_format else quoted
+            select_sql.append(f"{date_sql} AS {quoted}")
+        elif col in dirty:
+            select_sql.append(f"TRY_CAST({quoted} AS DOUBLE) AS {quoted}")
+        elif col in enum_types:
+            select_sql.append(f"CAST({quoted} AS {enum_types[col]}) AS {quoted}")
+        else:
+            select_sql.append(quoted)
+
+    # Sorted storage keeps each row group to a narrow date range, so
+    # zone maps on the date and derived columns skip most of them
+    order_sql = ""
+    if date_sql:
+        select_sql += derived_time_select(date_sql)
+        order_sql = f" ORDER BY {date_sql}"
+
+    staging = f"{table_name}__typed"
+    con.execute(
+        f"CREATE OR REPLACE TABLE {quote_identifier(staging)} AS "
+        f"SELECT {', '.join(select_sql)} FROM {quote_identifier(table_name)}{order_sql}"
+    )
+
+    if table_name in get_connection_state(con)["frames"]:
+        unregister_frame(con, table_name)
+    else:
+        con.execute(f"DROP TABLE {quote_identifier(table_name)}")
+    con.execute(f"ALTER TABLE {quote_identifier(staging)} RENAME TO {quote_identifier(table_name)}")
+
+    # Cursors and cached results still point at the old relation
+    reset_thread_cursors(con)
+    invalidate_results(con)
+
+    if date_sql:
+        semantic_schema["time_columns"] = dict(DERIVED_TIME_COLUMNS)
+
+    report = {
+        "typed": True,
+        "metrics": {
+            m: {"type": "DOUBLE", "dirty_values": int(dirty[m])}
+            for m in text_metrics
+        },
+        "enum_dimensions": list(enum_types),
+        "date": (
+            {"column": date_column, "format": date_format, "sorted": True}
+            if date_sql else None
+        ),
+    }
+    get_connection_state(con)["typed_table"] = report
+    return report
+
+
+def widen_enum_columns(con: duckdb.DuckDBPyConnection, table_name: str, source: str, table_types: dict) -> dict:
+    """
+    Before an append: ENUM columns are re-created with the new rows' values
+    (or turned back into VARCHAR past TYPED_TABLE_MAX_ENUM_VALUES), so no
+    value is lost to the cast. Returns the updated column types.
+    """
+    max_enum_values = get_typed_table_settings()["max_enum_values"]
+    source_columns = {col for col, _ in DuckDBDataset(con, source).describe()}
+
+    for col, col_type in list(table_types.items()):
+        if col not in source_columns or not str(col_type).upper().startswith("ENUM"):
+            continue
+
+        quoted = quote_identifier(col)
+        new_values = con.execute(
+            f"SELECT DISTINCT CAST({quoted} AS VARCHAR) FROM {source} "
+            f"WHERE {quoted} IS NOT NULL AND TRY_CAST(CAST({quoted} AS VARCHAR) AS {col_type}) IS NULL"
+        ).fetchall()
+        if not new_values:
+            continue
+
+        values = [
+            row[0] for row in con.execute(
+                f"SELECT UNNEST(enum_range(NULL::{col_type}))"
+            ).fetchall()
+        ] + sorted(row[0] for row in new_values)
+        new_type = enum_type(values) if len(values) <= max_enum_values else "VARCHAR"
+
+        con.execute(
+            f"ALTER TABLE {quote_identifier(table_name)} ALTER COLUMN {quoted} TYPE {new_type}"
+        )
+        table_types[col] = new_type
+
+    return table_types
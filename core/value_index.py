@@ -0,0 +1,156 @@
+import difflib
+import re
+
+from config.data_config import get_value_index_settings
+from db.duckdb_conn import quote_identifier
+
+
+def normalize_value(value) -> str:
+    """
+    Case, spacing and punctuation insensitive form: "T-Shirt " -> "tshirt".
+    """
+    return re.sub(r"[\W_]+", "", str(value).casefold())
+
+
+class ValueIndex:
+    """
+    Distinct values of each low-cardinality dimension, so filter values
+    can be mapped to the spelling stored in the table before SQL is built.
+    """
+
+    def __init__(self, values: dict, fuzzy_cutoff: float = 0.8):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.values = {}
+        self.normalized = {}
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+        for column, column_values in values.items():
+            self.add_column(column, column_values)
+
+    def add_column(self, column: str, column_values):
+        self.values[column] = set(column_values)
+        lookup = {}
+        for value in sorted(self.values[column]):
+            lookup.setdefault(normalize_value(value), value)
+        self.normalized[column] = lookup
+
+    def add_values(self, column: str, column_values, max_values: int):
+        """
+        Extend an indexed column with newly loaded values. A column that
+        grows past `max_values` is dropped, so its filters pass unchecked.
+        """
+        if column not in self.values:
+            return
+
+        values = self.values[column] | set(column_values)
+        if len(values) > max_values:
+            del self.values[column]
+            del self.normalized[column]
+            return
+
+        self.add_column(column, values)
+
+    def resolve(self, column: str, value):
+        """
+        Canonical value for `value`, or None when nothing matches.
+        Columns that are not indexed pass the value through unchanged.
+        """
+        if column not in self.values or not isinstance(value, (str, int, float)):
+            return value
+
+        value = str(value)
+        if value in self.values[column]:
+            self.exact_hits += 1
+            return value
+
+        lookup = self.normalized[column]
+        key = normalize_value(value)
+        if key in lookup:
+            self.exact_hits += 1
+            return lookup[key]
+
+        close = difflib.get_close_matches(key, list(lookup), n=1, cutoff=self.fuzzy_cutoff)
+        if close:
+            self.fuzzy_hits += 1
+            return lookup[close[0]]
+
+        self.misses += 1
+        return None
+
+    def resolve_filters(self, filters: dict, skip=()):
+        """
+        Returns (filters with canonical values, {column: value} that match nothing).
+        Columns in `skip` (e.g. logical time filters) pass through unchecked.
+        """
+        resolved = {}
+        unmatched = {}
+
+        for column, value in filters.items():
+            if column in skip:
+                resolved[column] = value
+                continue
+
+            canonical = self.resolve(column, value)
+            if canonical is None:
+                unmatched[column] = value
+            else:
+                resolved[column] = canonical
+
+        return resolved, unmatched
+
+    def suggestions(self, column: str, value, n: int = 3) -> list:
+        lookup = self.normalized.get(column, {})
+        close = difflib.get_close_matches(normalize_value(value), list(lookup), n=n, cutoff=0.5)
+        return [lookup[key] for key in close]
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.fuzzy_hits + self.misses
+        return {
+            "columns": {column: len(values) for column, values in self.values.items()},
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.fuzzy_hits) / lookups if lookups else 0.0,
+        }
+
+
+def refresh_value_index(value_index: ValueIndex, con, source: str):
+    """
+    Add the distinct values of `source` (e.g. rows just appended) to every
+    indexed column it contains.
+    """
+    max_values = get_value_index_settings()["max_values"]
+    source_columns = {row[0] for row in con.execute(f"DESCRIBE {source}").fetchall()}
+
+    for column in [c for c in list(value_index.values) if c in source_columns]:
+        quoted = quote_identifier(column)
+        rows = con.execute(
+            f"SELECT DISTINCT CAST({quoted} AS VARCHAR) FROM {source} "
+            f"WHERE {quoted} IS NOT NULL LIMIT {max_values + 1}"
+        ).fetchall()
+        value_index.add_values(column, [row[0] for row in rows], max_values)
+
+
+def build_value_index(con, dimensions: list, table_name: str = "sales") -> ValueIndex:
+    """
+    One DISTINCT scan per dimension. Dimensions above the cardinality cap
+    (SKUs, order ids ...) are skipped and their filters are not checked.
+    """
+    settings = get_value_index_settings()
+    max_values = settings["max_values"]
+    table = quote_identifier(table_name)
+    values = {}
+
+    for column in dimensions:
+        quoted = quote_identifier(column)
+        rows = con.execute(
+            f"SELECT DISTINCT CAST({quoted} AS VARCHAR) FROM {table} "
+            f"WHERE {quoted} IS NOT NULL LIMIT {max_values + 1}"
+        ).fetchall()
+
+        if len(rows) <= max_values:
+            values[column] = [row[0] for row in rows]
+
+    return ValueIndex(values, settings["fuzzy_cutoff"])
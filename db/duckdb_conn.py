@@ -1,11 +1,341 @@
+import json
+import logging
+import threading
+import weakref
+
 import duckdb
 import pandas as pd
 
+from config.data_config import get_duckdb_settings
 
+logger = logging.getLogger(__name__)
 
+NATIVE_READERS = {
+    "csv": "read_csv",
+    "parquet": "read_parquet",
+}
+
+# Strings pandas.read_csv treats as missing, so both engines agree on NULLs
+CSV_NULL_STRINGS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
+# duckdb_settings() names reported by engine_settings
+ENGINE_SETTINGS = [
+    "threads", "memory_limit", "temp_directory",
+    "max_temp_directory_size", "enable_object_cache",
+]
+
+# Profiling metrics behind record_query_memory
+MEMORY_PROFILING_SETTINGS = json.dumps({
+    "TOTAL_MEMORY_ALLOCATED": "true",
+    "SYSTEM_PEAK_BUFFER_MEMORY": "true",
+    "SYSTEM_PEAK_TEMP_DIR_SIZE": "true",
+})
+
+
+class DuckDBDataset:
+    """
+    A tabular dataset that lives inside DuckDB instead of a pandas DataFrame.
+    The table (or view) is already created on `con` under `table_name`.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, table_name: str = "sales", source=None, time_columns=None):
+        self.con = con
+        self.table_name = table_name
+        self.source = source
+        # Logical time grain -> physical column, e.g. {"year": "year", "month": "month"}
+        self.time_columns = time_columns or {}
+
+    @property
+    def columns(self) -> list:
+        return [row[0] for row in self.describe()]
+
+    def describe(self) -> list:
+        """Return (column_name, column_type) pairs."""
+        rows = self.con.execute(f'DESCRIBE "{self.table_name}"').fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def __len__(self) -> int:
+        return self.con.execute(f'SELECT COUNT(*) FROM "{self.table_name}"').fetchone()[0]
+
+
+def quote_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def quote_identifier(identifier: str) -> str:
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def native_source_sql(file_path, file_type: str, all_varchar: bool = False, hive_partitioning: bool = False) -> str:
+    """
+    Table-function SQL that scans one file, or a list of files, on disk.
+    """
+    if file_type not in NATIVE_READERS:
+        raise ValueError(f"DuckDB cannot natively load file type: {file_type}")
+
+    options = []
+
+    if isinstance(file_path, (list, tuple)):
+        source = "[" + ", ".join(quote_literal(f) for f in file_path) + "]"
+        options.append("union_by_name = true")
+    else:
+        source = quote_literal(file_path)
+
+    if hive_partitioning:
+        options.append("hive_partitioning = true")
+
+    if file_type == "csv":
+        null_strings = ", ".join(quote_literal(v) for v in CSV_NULL_STRINGS)
+        options.append(f"nullstr = [{null_strings}]")
+        if all_varchar:
+            options.append("all_varchar = true")
+
+    return f"{NATIVE_READERS[file_type]}({', '.join([source] + options)})"
+
+
+def duckdb_config(settings: dict) -> dict:
+    """
+    duckdb.connect(config=...) options for the configured settings;
+    unset values keep DuckDB's defaults.
+    """
+    config = {"enable_object_cache": settings["object_cache"]}
+
+    for option in ["threads", "memory_limit", "temp_directory", "max_temp_directory_size"]:
+        if settings[option]:
+            config[option] = settings[option]
+
+    return config
+
+
+def open_duckdb_connection() -> duckdb.DuckDBPyConnection:
+    """
+    Open an in-memory DuckDB connection with threads, memory limit,
+    spilling and the object cache configured (DUCKDB_* variables).
+    With DUCKDB_PROFILE_MEMORY, queries run through thread_cursor record
+    their memory use (query_memory_stats).
+    """
+    settings = get_duckdb_settings()
+    con = duckdb.connect(database=":memory:", config=duckdb_config(settings))
+
+    if settings["profile_memory"]:
+        get_connection_state(con)["query_memory"] = {
+            "queries": 0,
+            "max_allocated_bytes": 0,
+            "peak_buffer_bytes": 0,
+            "peak_temp_bytes": 0,
+        }
 
-def create_duckdb_connection(df: pd.DataFrame):
-    con = duckdb.connect(database=":memory:")
-    con.register("sales", df)
     return con
 
+
+def engine_settings(con: duckdb.DuckDBPyConnection) -> dict:
+    """
+    Effective values of the engine settings, as DuckDB reports them.
+    """
+    rows = con.execute(
+        "SELECT name, value FROM duckdb_settings() WHERE list_contains(?, name)",
+        [ENGINE_SETTINGS]
+    ).fetchall()
+    return dict(sorted(rows, key=lambda row: ENGINE_SETTINGS.index(row[0])))
+
+
+def enable_memory_profiling(cursor: duckdb.DuckDBPyConnection):
+    cursor.execute("PRAGMA enable_profiling = 'no_output'")
+    cursor.execute(f"SET custom_profiling_settings = {quote_literal(MEMORY_PROFILING_SETTINGS)}")
+
+
+def record_query_memory(con: duckdb.DuckDBPyConnection, cursor: duckdb.DuckDBPyConnection):
+    """
+    Fold the memory metrics of the cursor's last query into the
+    connection's stats. Allocated bytes are per query; DuckDB reports
+    buffer memory and spilled bytes as peaks since the database opened.
+    No-op unless DUCKDB_PROFILE_MEMORY is set.
+    """
+    state = get_connection_state(con)
+    stats = state.get("query_memory")
+    if stats is None:
+        return
+
+    try:
+        metrics = json.loads(cursor.get_profiling_information(format="json"))
+    except (duckdb.Error, ValueError):
+        return
+
+    allocated = metrics.get("total_memory_allocated", 0)
+    with state["lock"]:
+        stats["queries"] += 1
+        stats["max_allocated_bytes"] = max(stats["max_allocated_bytes"], allocated)
+        stats["peak_buffer_bytes"] = max(stats["peak_buffer_bytes"], metrics.get("system_peak_buffer_memory", 0))
+        stats["peak_temp_bytes"] = max(stats["peak_temp_bytes"], metrics.get("system_peak_temp_dir_size", 0))
+
+    logger.debug(
+        "Query allocated %d bytes (peak buffer %d, spilled %d): %s",
+        allocated,
+        metrics.get("system_peak_buffer_memory", 0),
+        metrics.get("system_peak_temp_dir_size", 0),
+        " ".join(str(metrics.get("query_name", "")).split())[:200],
+    )
+
+
+def query_memory_stats(con: duckdb.DuckDBPyConnection):
+    """
+    Memory stats of profiled queries, or None when profiling is off.
+    """
+    stats = get_connection_state(con).get("query_memory")
+    return dict(stats) if stats is not None else None
+
+
+def load_file_into_duckdb(file_path, file_type: str, table_name: str = "sales") -> DuckDBDataset:
+    """
+    Let DuckDB scan a CSV / Parquet file directly, without a pandas copy.
+    """
+    settings = get_duckdb_settings()
+    source_sql = native_source_sql(file_path, file_type)
+    con = open_duckdb_connection()
+
+    if settings["materialize"] == "view":
+        con.execute(f'CREATE VIEW "{table_name}" AS SELECT * FROM {source_sql}')
+        return DuckDBDataset(con, table_name, source=file_path)
+
+    try:
+        con.execute(f'CREATE TABLE "{table_name}" AS SELECT * FROM {source_sql}')
+    except duckdb.Error:
+        if file_type != "csv":
+            raise
+        # Sniffed types broke on a dirty row further down the file.
+        # Metrics are TRY_CAST at query time, so plain text is safe here.
+        source_sql = native_source_sql(file_path, file_type, all_varchar=True)
+        con.execute(f'CREATE OR REPLACE TABLE "{table_name}" AS SELECT * FROM {source_sql}')
+
+    return DuckDBDataset(con, table_name, source=file_path)
+
+
+def load_partitioned_into_duckdb(files: list, file_type: str, partitions: list, table_name: str = "sales") -> DuckDBDataset:
+    """
+    Expose many files as one `sales` view. Files are only scanned at query
+    time, and filters on the year / quarter / month partition columns let
+    DuckDB skip whole files.
+    """
+    con = open_duckdb_connection()
+    grains = ["year", "quarter", "month"]
+
+    # ---------- Hive layout: year=2021/month=3/part.csv ----------
+    if all(p.get("hive") for p in partitions):
+        source_sql = native_source_sql(files, file_type, hive_partitioning=True)
+        con.execute(f'CREATE VIEW "{table_name}" AS SELECT * FROM {source_sql}')
+
+        time_columns = {
+            grain: partitions[0]["hive_columns"][grain]
+            for grain in grains
+            if all(grain in p for p in partitions)
+        }
+        return DuckDBDataset(con, table_name, source=files, time_columns=time_columns)
+
+    # ---------- Time keys parsed from file names ----------
+    data_columns = {
+        row[0].lower()
+        for row in con.execute(f"DESCRIBE SELECT * FROM {native_source_sql(files[0], file_type)}").fetchall()
+    }
+    derived = [
+        grain for grain in grains
+        if grain not in data_columns and all(grain in p for p in partitions)
+    ]
+
+    if not derived:
+        source_sql = native_source_sql(files, file_type)
+        con.execute(f'CREATE VIEW "{table_name}" AS SELECT * FROM {source_sql}')
+        return DuckDBDataset(con, table_name, source=files)
+
+    # One branch per file with constant partition columns: a time filter
+    # folds the non-matching branches away, so their files are never read.
+    branches = []
+    for file_path, values in zip(files, partitions):
+        constants = ", ".join(f'{values[grain]} AS "{grain}"' for grain in derived)
+        branches.append(f"SELECT *, {constants} FROM {native_source_sql(file_path, file_type)}")
+
+    con.execute(f'CREATE VIEW "{table_name}" AS ' + "\nUNION ALL BY NAME\n".join(branches))
+    return DuckDBDataset(con, table_name, source=files, time_columns={g: g for g in derived})
+
+
+# Per-connection bookkeeping, dropped together with the connection
+_connection_state = weakref.WeakKeyDictionary()
+
+
+def get_connection_state(con: duckdb.DuckDBPyConnection) -> dict:
+    state = _connection_state.get(con)
+
+    if state is None:
+        state = {
+            "lock": threading.Lock(),
+            "frames": {},
+            "cursors": threading.local(),
+        }
+        _connection_state[con] = state
+
+    return state
+
+
+def register_frame(con: duckdb.DuckDBPyConnection, name: str, df: pd.DataFrame):
+    con.register(name, df)
+    get_connection_state(con)["frames"][name] = df
+    reset_thread_cursors(con)
+    invalidate_results(con)
+
+
+def unregister_frame(con: duckdb.DuckDBPyConnection, name: str):
+    try:
+        con.unregister(name)
+    except duckdb.Error:
+        pass
+    get_connection_state(con)["frames"].pop(name, None)
+    reset_thread_cursors(con)
+    invalidate_results(con)
+
+
+def invalidate_results(con: duckdb.DuckDBPyConnection):
+    """
+    Drop cached query results (core.query_cache) after the data changed.
+    """
+    cache = get_connection_state(con).get("result_cache")
+    if cache is not None:
+        cache.invalidate()
+
+
+def reset_thread_cursors(con: duckdb.DuckDBPyConnection):
+    get_connection_state(con)["cursors"] = threading.local()
+
+
+def thread_cursor(con: duckdb.DuckDBPyConnection) -> duckdb.DuckDBPyConnection:
+    """
+    DuckDB connections must not be shared between threads, so each thread
+    queries through its own cursor on the same database. Registered
+    DataFrames are connection-local and are registered again (zero-copy).
+    """
+    state = get_connection_state(con)
+    local = state["cursors"]
+    cursor = getattr(local, "cursor", None)
+
+    if cursor is None:
+        with state["lock"]:
+            cursor = con.cursor()
+            for name, df in state["frames"].items():
+                cursor.register(name, df)
+            # Profiling settings are cursor-local
+            if "query_memory" in state:
+                enable_memory_profiling(cursor)
+        local.cursor = cursor
+
+    return cursor
+
+
+def create_duckdb_connection(df: pd.DataFrame):
+    if isinstance(df, DuckDBDataset):
+        return df.con
+
+    con = open_duckdb_connection()
+    register_frame(con, "sales", df)
+    return con
@@ -6,22 +6,21 @@ from core.file_detector import detect_file_type
 from core.loader import load_data
 from core.profiler import profile_input
 from core.semantic_schema import generate_semantic_schema
+from core.schema_store import get_schema_store
+from core.value_index import build_value_index
+from core.token_ledger import get_token_ledger
+from core.query_cache import get_result_cache
+from core.rollups import build_rollups, rollup_stats
+from core.typed_table import build_typed_table
+from core.llm_gateway import run_async
+from config.data_config import get_rollup_settings
 
-from db.duckdb_conn import create_duckdb_connection
+from db.duckdb_conn import DuckDBDataset, create_duckdb_connection, engine_settings, query_memory_stats
 
-from agents.mode_detection_agent import detect_mode
-from agents.intent_extraction_agent import extract_query_intent
-from agents.intent_merge import merge_with_previous_intent
-from agents.data_extraction_agent import build_sql_query, execute_query
-from agents.validation_reasoning_agent import apply_business_reasoning
-from agents.explanation_agent import generate_explanation
-from agents.summarization_agent import (
-    generate_summary_intents,
-    assemble_summary_results,
-)
+from agents.pipeline import answer_question_async
+from agents.intent_rule_parser import get_rule_parser_stats
 
 from memory.conversation_memory import ConversationMemory
-from agents.time_followup_resolver import resolve_time_followup
 
 
 # -------------------------------
@@ -38,7 +37,7 @@ print("\n🔹 Loading dataset...")
 file_type = detect_file_type(DATASET_PATH)
 raw_data = load_data(DATASET_PATH, file_type)
 
-if not isinstance(raw_data, pd.DataFrame):
+if not isinstance(raw_data, (pd.DataFrame, DuckDBDataset)):
     raise ValueError("This demo supports tabular datasets only (CSV / Excel).")
 
 profile = profile_input(raw_data)
@@ -50,11 +49,27 @@ with open("schemas/semantic_schema.json", "w") as f:
 print("\n✅ Semantic Schema Detected:")
 print(json.dumps(semantic_schema, indent=2))
 
+schema_store = get_schema_store()
+if schema_store is not None:
+    print("\n🗂️ Schema store:", schema_store.stats())
+
 
 # -------------------------------
 # SETUP DB + MEMORY
 # -------------------------------
 con = create_duckdb_connection(raw_data)
+print("\n⚙️ DuckDB settings:", engine_settings(con))
+
+typed_report = build_typed_table(con, semantic_schema, TABLE_NAME)
+if typed_report["typed"]:
+    print("\n🧹 Typed table:", json.dumps(typed_report))
+
+value_index = build_value_index(con, semantic_schema.get("dimensions", []), TABLE_NAME)
+
+if get_rollup_settings()["enabled"]:
+    rollups = build_rollups(con, semantic_schema, TABLE_NAME)
+    print(f"\n📦 Built {len(rollups)} rollups")
+
 memory = ConversationMemory()
 
 
@@ -68,82 +83,36 @@ while True:
     user_input = input("User: ").strip()
 
     if user_input.lower() in ["exit", "quit"]:
+        print("\n⚡ Rule-based intents:", get_rule_parser_stats())
+        print("🔎 Filter values:", value_index.stats())
+        print("🧾 LLM tokens:", get_token_ledger().stats())
+        if get_result_cache(con) is not None:
+            print("🗄️ Query results:", get_result_cache(con).stats())
+        if get_rollup_settings()["enabled"]:
+            print("📦 Rollups:", rollup_stats(con))
+        if query_memory_stats(con) is not None:
+            print("🧮 Query memory:", query_memory_stats(con))
         print("👋 Exiting.")
         break
 
     # ---------------------------
-    # MODE DETECTION
+    # PIPELINE (mode + intent run concurrently)
     # ---------------------------
-    mode = detect_mode(user_input)
+    result = run_async(
+        answer_question_async(user_input, semantic_schema, con, memory, TABLE_NAME, value_index)
+    )
 
-    # ===========================
-    # SUMMARIZATION MODE
-    # ===========================
-    if mode == "summarization":
+    if result["mode"] == "summarization":
         print("\n[Mode: Summarization]\n")
-
-        summary_intents = generate_summary_intents(semantic_schema)
-        results = {}
-
-        for item in summary_intents:
-            sql = build_sql_query(item["intent"], TABLE_NAME)
-            results[item["name"]] = execute_query(con, sql)
-
-        summary_facts = assemble_summary_results(results)
-
-        final_answer = generate_explanation(
-            user_input,
-            summary_facts
-        )
-
-        print("Assistant:", final_answer)
+        print("Assistant:", result["answer"])
         continue
 
-    # ===========================
-    # Q&A MODE
-    # ===========================
     print("\n[Mode: Q&A]\n")
 
-    intent_response = extract_query_intent(user_input, semantic_schema)
-
     # Handle invalid / infeasible intent
-    if intent_response.get("status") != "valid":
-        print("Assistant:", intent_response.get("reason"))
-        print("Suggestion:", intent_response.get("suggestion"))
-        continue
-
-    current_intent = intent_response["intent"]
-
-    # ✅ Merge with conversation memory (ONLY HERE)
-    merged_intent = merge_with_previous_intent(
-        current_intent,
-        memory.get_last_intent()
-    )
-    merged_intent["time_fields"] = semantic_schema.get("time_fields", [])
-
-    # Update memory
-    memory.update_intent(merged_intent)
-    merged_intent = resolve_time_followup(
-    user_input,
-    merged_intent,
-    semantic_schema
-    )
-    
-    # STEP 3: SQL
-    sql = build_sql_query(merged_intent, TABLE_NAME)
-    result_df = execute_query(con, sql)
-
-    # STEP 4: Reasoning
-    reasoning_output = apply_business_reasoning(merged_intent, result_df)
-
-    if reasoning_output.get("status") != "success":
-        print("Assistant:", reasoning_output.get("message"))
+    if result["status"] == "invalid":
+        print("Assistant:", result["reason"])
+        print("Suggestion:", result["suggestion"])
         continue
 
-    # STEP 5: Explanation
-    final_answer = generate_explanation(
-        user_input,
-        reasoning_output
-    )
-
-    print("Assistant:", final_answer)
+    print("Assistant:", result["answer"])
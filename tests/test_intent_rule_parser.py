@@ -0,0 +1,63 @@
+import pytest
+
+from agents.intent_rule_parser import parse_intent_rules
+
+SCHEMA = {
+    "metrics": ["Stock"],
+    "dimensions": ["Category", "SKU", "Size", "Color"],
+}
+
+
+def test_total_by_dimension():
+    intent = parse_intent_rules("total stock by category", SCHEMA)
+
+    assert intent["metric"] == "Stock"
+    assert intent["aggregation"] == "sum"
+    assert intent["group_by"] == ["Category"]
+    assert "order_by" not in intent
+
+
+def test_top_n_orders_and_limits():
+    intent = parse_intent_rules("top 5 SKUs by stock", SCHEMA)
+
+    assert intent["group_by"] == ["SKU"]
+    assert intent["order_by"] == "value"
+    assert intent["order_direction"] == "DESC"
+    assert intent["limit"] == 5
+
+
+@pytest.mark.parametrize("question, direction", [
+    ("which color has the most stock", "DESC"),
+    ("max stock by size", "DESC"),
+    ("which category has the least stock", "ASC"),
+])
+def test_ranking_word_returns_single_best_group(question, direction):
+    intent = parse_intent_rules(question, SCHEMA)
+
+    assert intent["order_by"] == "value"
+    assert intent["order_direction"] == direction
+    assert intent["limit"] == 1
+
+
+def test_quarter_and_year_filters():
+    intent = parse_intent_rules("total stock by category in Q4 2023", SCHEMA)
+
+    assert intent["filters"] == {"year": "2023", "quarter": "Q4"}
+    assert intent["time_granularity"] == "quarter"
+
+
+@pytest.mark.parametrize("question", [
+    # min / max of the metric itself
+    "min stock",
+    "maximum stock",
+    # distinct counts of a dimension
+    "how many SKUs are there?",
+    "number of colors",
+    "how many categories do we have",
+    "count of sku by category",
+    # needs the LLM
+    "stock growth year over year",
+    "total stock for Kurta",
+])
+def test_falls_through_to_llm(question):
+    assert parse_intent_rules(question, SCHEMA) is None
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from agents.query_router import route_query
+from core.incremental import append_data
+from core.profiler import profile_input
+from core.rollups import build_rollups, get_rollups, rollup_stats
+from core.typed_table import build_typed_table
+from db.duckdb_conn import create_duckdb_connection
+
+
+def load_sales():
+    df = pd.DataFrame({
+        "Date": ["2023-01-05", "2023-02-10", "2023-04-01", "2023-07-15"],
+        "Category": ["Kurta", "Top", "Kurta", "Top"],
+        "Size": ["M", "L", "L", "M"],
+        "Stock": [10, 20, 30, 40],
+    })
+    schema = {
+        "metrics": ["Stock"],
+        "dimensions": ["Category", "Size"],
+        "time_fields": ["Date"],
+    }
+    profile = profile_input(df)
+    con = create_duckdb_connection(df)
+    build_typed_table(con, schema)
+    build_rollups(con, schema)
+    return con, profile, schema
+
+
+def test_rollups_survive_append_with_new_dimension_value(tmp_path):
+    con, profile, schema = load_sales()
+    rollups = rollup_stats(con)["rollups"]
+    assert rollups > 0
+
+    new_rows = tmp_path / "new_rows.csv"
+    new_rows.write_text("Date,Category,Size,Stock\n2023-08-01,Saree,M,5\n")
+    profile, schema = append_data(con, str(new_rows), "csv", profile, schema)
+
+    assert rollup_stats(con)["rollups"] == rollups
+
+    intent = {
+        "metric": "Stock",
+        "aggregation": "sum",
+        "group_by": ["Category"],
+        "filters": {},
+        "time_granularity": None,
+        "comparison": None,
+        "clean_metrics": schema["clean_metrics"],
+    }
+    sql, params = route_query(con, intent, "sales")
+    rows = dict(con.execute(sql, params).fetchall())
+
+    assert get_rollups(con)["hits"] == 1
+    assert rows == {"Kurta": 40, "Top": 60, "Saree": 5}